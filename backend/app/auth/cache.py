@@ -0,0 +1,41 @@
+"""
+Per-process caches that let most requests authenticate without the database.
+
+``token_cache`` maps an access token to the user id it was verified for, so
+the JWT signature is checked once per token rather than once per request;
+an entry never outlives the token's own expiry. ``user_cache`` holds a small
+snapshot of each user (role, active flag, names), which is all the route
+dependencies need. update_user and delete_user invalidate the snapshot in
+the worker that handled them; other workers pick up the change once their
+entry's USER_CACHE_TTL_SECONDS runs out.
+"""
+
+from time import time
+from typing import NamedTuple
+
+from app.config import settings
+from app.models.user import UserRole
+from app.services.cache import LRUCache
+
+
+class CurrentUser(NamedTuple):
+    id: int
+    role: UserRole
+    is_active: bool
+    first_name: str
+    last_name: str
+
+
+token_cache: LRUCache[str, int] = LRUCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TTL_SECONDS)
+user_cache: LRUCache[int, CurrentUser] = LRUCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
+
+
+def remember_token(token: str, user_id: int, expires_at: float | None) -> None:
+    """Cache a verified access token until the earlier of its expiry and the cache TTL."""
+    remaining = None if expires_at is None else expires_at - time()
+    if remaining is None or remaining > 0:
+        token_cache.put(token, user_id, remaining)
+
+
+def invalidate_user(user_id: int) -> None:
+    user_cache.discard(user_id)
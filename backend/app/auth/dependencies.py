@@ -1,6 +1,7 @@
 from fastapi import Cookie, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.auth.cache import CurrentUser, remember_token, token_cache, user_cache
 from app.auth.jwt import decode_token
 from app.database import get_db
 from app.models.user import User, UserRole
@@ -9,22 +10,36 @@ from app.models.user import User, UserRole
 def get_current_user(
     access_token: str | None = Cookie(default=None),
     db: Session = Depends(get_db),
-) -> User:
+) -> CurrentUser:
+    """The authenticated user, usually from the per-process caches without touching the database."""
     if not access_token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    payload = decode_token(access_token)
-    if not payload or payload.get("type") != "access":
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user_id = payload.get("sub")
-    if not user_id:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user_id = token_cache.get(access_token)
+    if user_id is None:
+        payload = decode_token(access_token)
+        if not payload or payload.get("type") != "access":
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        if not payload.get("sub"):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        user_id = int(payload["sub"])
+        remember_token(access_token, user_id, payload.get("exp"))
+
+    user = user_cache.get(user_id)
+    if user is None:
+        row = (
+            db.query(User.id, User.role, User.is_active, User.first_name, User.last_name)
+            .filter(User.id == user_id)
+            .first()
+        )
+        if row:
+            user = CurrentUser(*row)
+            user_cache.put(user_id, user)
     if not user or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
     return user
 
 
-def require_supervisor(current_user: User = Depends(get_current_user)) -> User:
+def require_supervisor(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     if current_user.role != UserRole.supervisor:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Supervisor access required")
     return current_user
@@ -1,3 +1,9 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta, timezone
 
 import bcrypt
@@ -5,13 +11,60 @@ from jose import JWTError, jwt
 
 from app.config import settings
 
+# bcrypt releases the GIL, so this caps how many CPU cores logins can occupy;
+# a burst of logins queues here, without holding a request thread or the event
+# loop, instead of starving every other request.
+_password_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_THREADS, thread_name_prefix="bcrypt")
+
+_bulk_pool: ProcessPoolExecutor | None = None
+_bulk_pool_lock = threading.Lock()
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def _check(plain: str, hashed: str) -> bool:
+    return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    """Hash in the calling thread, for scripts; request handlers use hash_password_async."""
+    return _hash(password, settings.BCRYPT_ROUNDS)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+    return _check(plain, hashed)
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.wrap_future(_password_executor.submit(_hash, password, settings.BCRYPT_ROUNDS))
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await asyncio.wrap_future(_password_executor.submit(_check, plain, hashed))
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    """Hash many passwords in parallel on a process pool, for bulk account creation."""
+    global _bulk_pool
+    if len(passwords) < 2:
+        return [hash_password(p) for p in passwords]
+    workers = settings.PASSWORD_HASH_PROCESSES or os.cpu_count() or 1
+    with _bulk_pool_lock:
+        if _bulk_pool is None:
+            # spawn, not fork: the server process holds threads and DB connections
+            _bulk_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        pool = _bulk_pool
+    chunksize = max(1, len(passwords) // (workers * 4))
+    try:
+        return list(pool.map(_hash, passwords, [settings.BCRYPT_ROUNDS] * len(passwords), chunksize=chunksize))
+    except BrokenProcessPool:
+        # A worker died; start a fresh pool next time
+        with _bulk_pool_lock:
+            if _bulk_pool is pool:
+                _bulk_pool = None
+        raise
 
 
 def create_access_token(data: dict) -> str:
@@ -28,6 +81,17 @@ def create_refresh_token(data: dict) -> str:
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
+def create_feed_token(feed: str, subject_id: int, issued_by: int) -> str:
+    """Long-lived token for a calendar subscription URL (calendar apps cannot log in).
+
+    ``issued_by`` is the user who asked for the URL; the feed stops working
+    once they are deactivated, as well as when the token expires.
+    """
+    expire = datetime.now(timezone.utc) + timedelta(days=settings.FEED_TOKEN_EXPIRE_DAYS)
+    to_encode = {"sub": str(subject_id), "feed": feed, "by": str(issued_by), "exp": expire, "type": "feed"}
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
 def decode_token(token: str) -> dict | None:
     try:
         return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
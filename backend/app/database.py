@@ -1,10 +1,48 @@
+"""
+Engines and session factories.
+
+Writes go through ``engine``/``get_db``. Read-only endpoints use
+``get_read_db``, which is bound to DATABASE_READ_URL when one is configured
+(a streaming replica) and otherwise to the primary engine. Reads served by a
+replica can trail the primary by the replication lag, so only endpoints that
+tolerate that use it.
+
+For a local stand-in replica, point DATABASE_READ_URL at the primary SQLite
+file opened read-only, e.g. ``sqlite:///file:app.db?mode=ro&uri=true``: reads
+then go through a second engine and pool, and any accidental write on the
+read path fails.
+"""
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, Engine, make_url
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from app.config import settings
+from app.services.metrics import timed_pool_class
+
+
+def _create_engine(url: URL) -> Engine:
+    # The dialect's default pool, timed for the checkout-wait metric
+    pool_class = url.get_dialect().get_pool_class(url)
+    options: dict = {"poolclass": timed_pool_class(pool_class), "pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if issubclass(pool_class, QueuePool):
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        )
+    if settings.DB_STATEMENT_TIMEOUT_MS and url.get_backend_name() == "postgresql":
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return create_engine(url, **options)
+
+
+engine = _create_engine(make_url(settings.DATABASE_URL))
+read_engine = _create_engine(make_url(settings.DATABASE_READ_URL)) if settings.DATABASE_READ_URL else engine
 
-engine = create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+ReadSessionLocal = sessionmaker(bind=read_engine, autocommit=False, autoflush=False)
 
 
 class Base(DeclarativeBase):
@@ -17,3 +55,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
@@ -18,6 +18,8 @@ from app.routers import (
     shifts,
     users,
 )
+from app.services import metrics
+from app.services.pagination import NEXT_CURSOR_HEADER
 
 app = FastAPI(title="IT Help Desk Scheduler API", version="1.0.0")
 
@@ -27,7 +29,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
+app.add_middleware(metrics.MetricsMiddleware)
 
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -42,3 +46,8 @@ app.include_router(export.router)
 @app.get("/api/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/api/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,27 @@
+"""
+Enums shared by the ORM models and the API schemas.
+
+Kept apart from the model modules so the schemas, and through them the
+database-free scheduling core, can be imported without app.database
+building an engine.
+"""
+
+import enum
+
+
+class UserRole(str, enum.Enum):
+    student = "student"
+    supervisor = "supervisor"
+
+
+class ScheduleStatus(str, enum.Enum):
+    draft = "draft"
+    published = "published"
+    archived = "archived"
+
+
+class ShiftStatus(str, enum.Enum):
+    scheduled = "scheduled"
+    completed = "completed"
+    missed = "missed"
+    swapped = "swapped"
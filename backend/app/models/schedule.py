@@ -1,16 +1,10 @@
-import enum
 from datetime import date, datetime
 
 from sqlalchemy import Date, DateTime, Enum, ForeignKey, Integer, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
-
-
-class ScheduleStatus(str, enum.Enum):
-    draft = "draft"
-    published = "published"
-    archived = "archived"
+from app.models.enums import ScheduleStatus
 
 
 class Schedule(Base):
@@ -24,5 +18,10 @@ class Schedule(Base):
     generated_by: Mapped[int | None] = mapped_column(Integer, ForeignKey("users.id"), nullable=True)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # Bumped on publish, archive and every shift change; drives ETags and caches
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
 
     shifts = relationship("Shift", back_populates="schedule", cascade="all, delete-orphan")
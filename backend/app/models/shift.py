@@ -1,17 +1,10 @@
-import enum
 from datetime import date, time
 
 from sqlalchemy import Date, Enum, ForeignKey, Integer, String, Time
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
-
-
-class ShiftStatus(str, enum.Enum):
-    scheduled = "scheduled"
-    completed = "completed"
-    missed = "missed"
-    swapped = "swapped"
+from app.models.enums import ShiftStatus
 
 
 class Shift(Base):
@@ -1,15 +1,10 @@
-import enum
 from datetime import datetime
 
 from sqlalchemy import Boolean, DateTime, Enum, Float, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
-
-
-class UserRole(str, enum.Enum):
-    student = "student"
-    supervisor = "supervisor"
+from app.models.enums import UserRole
 
 
 class User(Base):
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Response, Cookie, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from app.auth.cache import CurrentUser
 from app.auth.dependencies import get_current_user
 from app.auth.jwt import (
     create_access_token,
     create_refresh_token,
     decode_token,
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
 )
 from app.database import get_db
 from app.models.user import User
@@ -16,29 +18,29 @@ from app.schemas.user import LoginRequest, TokenResponse, UserCreate, UserOut
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
+# register and login are async so that waiting for bcrypt holds neither the event
+# loop nor a threadpool thread; their database work still runs in the threadpool.
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-def register(body: UserCreate, response: Response, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.email == body.email).first():
+async def register(body: UserCreate, response: Response, db: Session = Depends(get_db)):
+    if await run_in_threadpool(_user_by_email, db, body.email):
         raise HTTPException(status_code=400, detail="Email already registered")
     user = User(
         email=body.email,
-        password_hash=hash_password(body.password),
+        password_hash=await hash_password_async(body.password),
         first_name=body.first_name,
         last_name=body.last_name,
         role=body.role,
         max_hours_per_week=body.max_hours_per_week,
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    await run_in_threadpool(_save, db, user)
     _set_tokens(response, user)
     return TokenResponse(message="Registered successfully", user=UserOut.model_validate(user))
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(body: LoginRequest, response: Response, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == body.email).first()
-    if not user or not verify_password(body.password, user.password_hash):
+async def login(body: LoginRequest, response: Response, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_user_by_email, db, body.email)
+    if not user or not await verify_password_async(body.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Account deactivated")
@@ -65,8 +67,15 @@ def refresh(
 
 
 @router.get("/me", response_model=UserOut)
-def me(current_user: User = Depends(get_current_user)):
-    return UserOut.model_validate(current_user)
+def me(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    # The cached snapshot lacks email and max hours, so load the full row
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    return UserOut.model_validate(user)
 
 
 @router.post("/logout")
@@ -76,6 +85,16 @@ def logout(response: Response):
     return {"message": "Logged out"}
 
 
+def _user_by_email(db: Session, email: str) -> User | None:
+    return db.query(User).filter(User.email == email).first()
+
+
+def _save(db: Session, user: User) -> None:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
+
 def _set_tokens(response: Response, user: User):
     token_data = {"sub": str(user.id), "role": user.role.value}
     response.set_cookie(
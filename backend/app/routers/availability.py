@@ -1,15 +1,34 @@
 import csv
 import io
-from datetime import time
+from itertools import groupby
+from typing import Literal
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy import and_, select
 from sqlalchemy.orm import Session
 
+from app.auth.cache import CurrentUser
 from app.auth.dependencies import get_current_user, require_supervisor
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.availability import Availability
 from app.models.user import User
-from app.schemas.availability import AvailabilityOut, AvailabilitySubmit, UserAvailabilityOut
+from app.schemas.availability import (
+    AvailabilityImportJobOut,
+    AvailabilityImportOut,
+    AvailabilityOut,
+    AvailabilitySubmit,
+    UserAvailabilityGridOut,
+    UserAvailabilityOut,
+)
+from app.services.availability_import import (
+    InvalidImportFile,
+    import_availability,
+    import_jobs,
+    spool_upload,
+    start_import_job,
+)
+from app.services.jobs import Job, JobLimitReached
+from app.services.scheduler_core import hours_mask
 
 router = APIRouter(prefix="/api/availability", tags=["availability"])
 
@@ -18,7 +37,7 @@ router = APIRouter(prefix="/api/availability", tags=["availability"])
 def submit_availability(
     body: AvailabilitySubmit,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     # Delete existing recurring availability for this user
     db.query(Availability).filter(
@@ -47,7 +66,7 @@ def submit_availability(
 @router.get("/me", response_model=list[AvailabilityOut])
 def get_my_availability(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     return (
         db.query(Availability)
@@ -57,132 +76,138 @@ def get_my_availability(
     )
 
 
-@router.get("/all", response_model=list[UserAvailabilityOut])
+@router.get("/all", response_model=list[UserAvailabilityOut | UserAvailabilityGridOut])
 def get_all_availability(
-    db: Session = Depends(get_db),
-    _supervisor: User = Depends(require_supervisor),
+    day: list[str] | None = Query(None),
+    user_ids: list[int] | None = Query(None),
+    format: Literal["slots", "grid"] = Query("slots"),
+    db: Session = Depends(get_read_db),
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
-    users = db.query(User).filter(User.is_active.is_(True)).order_by(User.last_name).all()
-    result = []
-    for user in users:
-        slots = (
-            db.query(Availability)
-            .filter(Availability.user_id == user.id)
-            .order_by(Availability.day_of_week, Availability.start_time)
-            .all()
+    """Every active user's availability, from one joined query.
+
+    ``day`` and ``user_ids`` narrow the result (both repeatable); users with no
+    matching slots are still listed. ``format=grid`` returns each user-day as
+    an hour bitmap instead of slot rows.
+    """
+    join_on = [Availability.user_id == User.id]
+    if day:
+        join_on.append(Availability.day_of_week.in_(day))
+    stmt = (
+        select(
+            User.id.label("uid"),
+            User.first_name,
+            User.last_name,
+            Availability.id,
+            Availability.day_of_week,
+            Availability.start_time,
+            Availability.end_time,
+            Availability.effective_date,
+            Availability.is_recurring,
         )
-        result.append(
-            UserAvailabilityOut(
-                user_id=user.id,
-                user_name=f"{user.first_name} {user.last_name}",
-                slots=[AvailabilityOut.model_validate(s) for s in slots],
+        .outerjoin(Availability, and_(*join_on))
+        .where(User.is_active.is_(True))
+        .order_by(User.last_name, User.id, Availability.day_of_week, Availability.start_time)
+    )
+    if user_ids:
+        stmt = stmt.where(User.id.in_(user_ids))
+
+    result = []
+    rows = db.execute(stmt.execution_options(yield_per=1000))
+    for uid, user_rows in groupby(rows, key=lambda r: r.uid):
+        user_rows = list(user_rows)
+        user_name = f"{user_rows[0].first_name} {user_rows[0].last_name}"
+        slots = [r for r in user_rows if r.id is not None]
+        if format == "grid":
+            days: dict[str, int] = {}
+            for r in slots:
+                if r.start_time.hour < r.end_time.hour:
+                    days[r.day_of_week] = days.get(r.day_of_week, 0) | hours_mask(
+                        r.start_time.hour, r.end_time.hour
+                    )
+            result.append(UserAvailabilityGridOut(user_id=uid, user_name=user_name, days=days))
+        else:
+            result.append(
+                UserAvailabilityOut(
+                    user_id=uid,
+                    user_name=user_name,
+                    slots=[
+                        AvailabilityOut(
+                            id=r.id,
+                            user_id=uid,
+                            day_of_week=r.day_of_week,
+                            start_time=r.start_time,
+                            end_time=r.end_time,
+                            effective_date=r.effective_date,
+                            is_recurring=r.is_recurring,
+                        )
+                        for r in slots
+                    ],
+                )
             )
-        )
     return result
 
 
-@router.post("/upload-csv", response_model=list[UserAvailabilityOut])
+@router.post("/upload-csv", response_model=AvailabilityImportOut)
 def upload_csv(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    _supervisor: User = Depends(require_supervisor),
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
     """Parse CSV in the format: Name, Max_Hours, Monday_8:00, Monday_9:00, ..."""
-    content = file.file.read().decode("utf-8")
-    reader = csv.DictReader(io.StringIO(content))
-    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
-    results = []
-
-    for row in reader:
-        name = row.get("Name", "").strip()
-        if not name:
-            continue
-
-        # Find or match user by first name
-        parts = name.split()
-        user = None
-        if len(parts) >= 2:
-            user = (
-                db.query(User)
-                .filter(User.first_name == parts[0], User.last_name == parts[1])
-                .first()
-            )
-        if not user:
-            user = db.query(User).filter(User.first_name == name).first()
-        if not user:
-            continue
-
-        # Update max hours if provided
-        max_hours = row.get("Max_Hours")
-        if max_hours:
-            user.max_hours_per_week = float(max_hours)
-
-        # Clear existing availability
-        db.query(Availability).filter(
-            Availability.user_id == user.id, Availability.is_recurring.is_(True)
-        ).delete()
-
-        # Parse availability columns (Day_HH:MM with value 1 = available)
-        avail_by_day: dict[str, list[int]] = {d: [] for d in days}
-        for col_name, value in row.items():
-            if "_" not in col_name or col_name in ("Name", "Max_Hours"):
-                continue
-            if str(value).strip() != "1":
-                continue
-            parts_col = col_name.rsplit("_", 1)
-            if len(parts_col) != 2:
-                continue
-            day, time_str = parts_col
-            if day not in days:
-                continue
-            try:
-                hour = int(time_str.split(":")[0])
-                avail_by_day[day].append(hour)
-            except ValueError:
-                continue
-
-        # Merge consecutive hours into time ranges
-        new_slots = []
-        for day in days:
-            hours = sorted(avail_by_day[day])
-            if not hours:
-                continue
-            range_start = hours[0]
-            prev = hours[0]
-            for h in hours[1:]:
-                if h == prev + 1:
-                    prev = h
-                else:
-                    avail = Availability(
-                        user_id=user.id,
-                        day_of_week=day,
-                        start_time=time(range_start, 0),
-                        end_time=time(prev + 1, 0),
-                        is_recurring=True,
-                    )
-                    db.add(avail)
-                    new_slots.append(avail)
-                    range_start = h
-                    prev = h
-            avail = Availability(
-                user_id=user.id,
-                day_of_week=day,
-                start_time=time(range_start, 0),
-                end_time=time(prev + 1, 0),
-                is_recurring=True,
-            )
-            db.add(avail)
-            new_slots.append(avail)
-
-        db.commit()
-        for s in new_slots:
-            db.refresh(s)
-        results.append(
-            UserAvailabilityOut(
-                user_id=user.id,
-                user_name=f"{user.first_name} {user.last_name}",
-                slots=[AvailabilityOut.model_validate(s) for s in new_slots],
-            )
-        )
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return import_availability(db, stream)
+    except (UnicodeDecodeError, csv.Error, InvalidImportFile) as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV file: {exc}")
+    finally:
+        # Leave closing the upload to FastAPI
+        stream.detach()
+
+
+def _import_job_out(job: Job) -> AvailabilityImportJobOut:
+    return AvailabilityImportJobOut(
+        id=job.id,
+        status=job.status.value,
+        **job.progress,
+        **(job.result or {}),
+        errors=job.warnings,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+    )
+
+
+@router.post("/imports", response_model=AvailabilityImportJobOut, status_code=202)
+def start_import(
+    file: UploadFile = File(...),
+    _supervisor: CurrentUser = Depends(require_supervisor),
+):
+    """Same CSV format as upload-csv, imported in the background; poll GET /imports/{id}."""
+    try:
+        job = start_import_job(spool_upload(file.file))
+    except JobLimitReached:
+        raise HTTPException(status_code=429, detail="Too many availability imports running")
+    return _import_job_out(job)
+
+
+@router.get("/imports/{job_id}", response_model=AvailabilityImportJobOut)
+def get_import(
+    job_id: str,
+    _supervisor: CurrentUser = Depends(require_supervisor),
+):
+    job = import_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return _import_job_out(job)
 
-    return results
+
+@router.delete("/imports/{job_id}", response_model=AvailabilityImportJobOut)
+def cancel_import(
+    job_id: str,
+    _supervisor: CurrentUser = Depends(require_supervisor),
+):
+    job = import_jobs.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return _import_job_out(job)
@@ -1,62 +1,201 @@
-import csv
-import io
+from datetime import date
+from email.utils import format_datetime, parsedate_to_datetime
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import Response as FastAPIResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response as FastAPIResponse, StreamingResponse
+from sqlalchemy import exists, select
+from sqlalchemy.orm import Session, aliased
 
+from app.auth.cache import CurrentUser
 from app.auth.dependencies import get_current_user
-from app.database import get_db
+from app.auth.jwt import create_feed_token, decode_token
+from app.database import get_read_db
+from app.models.location import Location
 from app.models.schedule import Schedule, ScheduleStatus
 from app.models.shift import Shift
 from app.models.user import User
-from app.services.ics_export import shifts_to_ics
+from app.schemas.feed import FeedLinkOut
+from app.services.ics_feeds import FEED_KINDS, feed_heads, last_modified, newest_of_week, render_feed
+from app.services.shift_export import stream_csv, stream_ics
+from app.services.versioning import digest_etag, etag_matches, not_modified, schedule_etag
 
 router = APIRouter(prefix="/api/export", tags=["export"])
 
 
+def _attachment(filename: str) -> dict[str, str]:
+    return {"Content-Disposition": f"attachment; filename={filename}"}
+
+
+def _range_conditions(start_date: date, end_date: date, statuses: list[ScheduleStatus] | None) -> list:
+    """Without ``statuses``, each week's newest published or archived schedule, as in the feeds."""
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    schedules = newest_of_week() if statuses is None else Schedule.status.in_(statuses)
+    return [
+        Shift.actual_date >= start_date,
+        Shift.actual_date <= end_date,
+        Shift.schedule_id.in_(select(Schedule.id).where(schedules)),
+    ]
+
+
 @router.get("/ics/{schedule_id}")
 def export_ics(
     schedule_id: int,
-    db: Session = Depends(get_db),
-    _user: User = Depends(get_current_user),
+    request: Request,
+    db: Session = Depends(get_read_db),
+    _user: CurrentUser = Depends(get_current_user),
 ):
-    schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+    schedule = db.query(Schedule.version, Schedule.week_start_date).filter(Schedule.id == schedule_id).first()
     if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
-    ics_data = shifts_to_ics(schedule.shifts)
-    return FastAPIResponse(
-        content=ics_data,
+    etag = schedule_etag(schedule_id, schedule.version, "ics")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    return StreamingResponse(
+        stream_ics(Shift.schedule_id == schedule_id),
         media_type="text/calendar",
-        headers={"Content-Disposition": f"attachment; filename=schedule-{schedule.week_start_date}.ics"},
+        headers={**_attachment(f"schedule-{schedule.week_start_date}.ics"), "ETag": etag},
     )
 
 
 @router.get("/csv/{schedule_id}")
 def export_csv(
     schedule_id: int,
-    db: Session = Depends(get_db),
-    _user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    _user: CurrentUser = Depends(get_current_user),
 ):
-    schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+    schedule = db.query(Schedule.week_start_date).filter(Schedule.id == schedule_id).first()
     if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Day", "Date", "Start", "End", "Location", "Worker"])
-    for shift in sorted(schedule.shifts, key=lambda s: (s.actual_date, s.start_time)):
-        writer.writerow([
-            shift.day_of_week,
-            str(shift.actual_date),
-            shift.start_time.strftime("%H:%M"),
-            shift.end_time.strftime("%H:%M"),
-            shift.location.name if shift.location else "",
-            f"{shift.user.first_name} {shift.user.last_name}" if shift.user else "",
-        ])
+    return StreamingResponse(
+        stream_csv(Shift.schedule_id == schedule_id),
+        media_type="text/csv",
+        headers=_attachment(f"schedule-{schedule.week_start_date}.csv"),
+    )
 
-    return FastAPIResponse(
-        content=output.getvalue(),
+
+@router.get("/ics")
+def export_ics_range(
+    start_date: date,
+    end_date: date,
+    status: list[ScheduleStatus] | None = Query(None),
+    _user: CurrentUser = Depends(get_current_user),
+):
+    """Every shift between two dates (inclusive) across schedules, e.g. a whole semester."""
+    conditions = _range_conditions(start_date, end_date, status)
+    return StreamingResponse(
+        stream_ics(*conditions),
+        media_type="text/calendar",
+        headers=_attachment(f"shifts-{start_date}-to-{end_date}.ics"),
+    )
+
+
+@router.get("/csv")
+def export_csv_range(
+    start_date: date,
+    end_date: date,
+    status: list[ScheduleStatus] | None = Query(None),
+    _user: CurrentUser = Depends(get_current_user),
+):
+    """Every shift between two dates (inclusive) across schedules, e.g. a whole semester."""
+    conditions = _range_conditions(start_date, end_date, status)
+    return StreamingResponse(
+        stream_csv(*conditions),
         media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=schedule-{schedule.week_start_date}.csv"},
+        headers=_attachment(f"shifts-{start_date}-to-{end_date}.csv"),
+    )
+
+
+def _feed_link(request: Request, feed: str, subject_id: int, issued_by: int) -> FeedLinkOut:
+    token = create_feed_token(feed, subject_id, issued_by)
+    url = str(request.url_for("calendar_feed", token=token))
+    return FeedLinkOut(url=url, webcal_url="webcal://" + url.split("://", 1)[1])
+
+
+@router.get("/feeds/me", response_model=FeedLinkOut)
+def my_feed_link(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Subscription URL for the current user's shifts across all published schedules."""
+    return _feed_link(request, "user", current_user.id, current_user.id)
+
+
+@router.get("/feeds/locations/{location_id}", response_model=FeedLinkOut)
+def location_feed_link(
+    location_id: int,
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Subscription URL for every shift at a location across all published schedules."""
+    if not db.query(Location.id).filter(Location.id == location_id, Location.is_active.is_(True)).first():
+        raise HTTPException(status_code=404, detail="Location not found")
+    return _feed_link(request, "location", location_id, current_user.id)
+
+
+@router.get("/feeds/{token}.ics", name="calendar_feed")
+def calendar_feed(
+    token: str,
+    request: Request,
+    db: Session = Depends(get_read_db),
+):
+    """The calendar itself; the signed token in the URL is the only credential.
+
+    Tokens without an expiry (issued before feeds expired) are refused, as are
+    feeds for a deactivated user or location or issued by a deactivated user.
+    """
+    payload = decode_token(token)
+    if (
+        not payload
+        or payload.get("type") != "feed"
+        or payload.get("feed") not in FEED_KINDS
+        or "exp" not in payload
+        or "by" not in payload
+    ):
+        raise HTTPException(status_code=404, detail="Feed not found")
+    kind, subject_id, issued_by = payload["feed"], int(payload["sub"]), int(payload["by"])
+
+    issuer = aliased(User)
+    issuer_active = exists().where(issuer.id == issued_by, issuer.is_active.is_(True))
+    if kind == "user":
+        subject = db.query(User.first_name, User.last_name).filter(
+            User.id == subject_id, User.is_active.is_(True), issuer_active
+        ).first()
+        calendar_name = f"Help Desk Shifts - {subject.first_name} {subject.last_name}" if subject else ""
+    else:
+        subject = db.query(Location.name).filter(
+            Location.id == subject_id, Location.is_active.is_(True), issuer_active
+        ).first()
+        calendar_name = f"Help Desk - {subject.name}" if subject else ""
+    if not subject:
+        raise HTTPException(status_code=404, detail="Feed not found")
+
+    heads = feed_heads(db, kind, subject_id)
+    etag = digest_etag(kind, subject_id, calendar_name, [(h.schedule_id, h.version) for h in heads])
+    modified = last_modified(heads)
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=300"}
+    if modified:
+        headers["Last-Modified"] = format_datetime(modified, usegmt=True)
+    if etag_matches(request, etag) or (
+        "if-none-match" not in request.headers and _not_modified_since(request, modified)
+    ):
+        return not_modified(etag)
+
+    return FastAPIResponse(
+        content=render_feed(db, kind, subject_id, heads, calendar_name),
+        media_type="text/calendar",
+        headers=headers,
     )
+
+
+def _not_modified_since(request: Request, modified) -> bool:
+    since = request.headers.get("if-modified-since")
+    if not since or modified is None:
+        return False
+    try:
+        return modified.replace(microsecond=0) <= parsedate_to_datetime(since)
+    except (TypeError, ValueError):
+        return False
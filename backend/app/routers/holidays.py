@@ -1,28 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
+from app.auth.cache import CurrentUser
 from app.auth.dependencies import get_current_user, require_supervisor
 from app.database import get_db
 from app.models.holiday import Holiday
-from app.models.user import User
 from app.schemas.holiday import HolidayCreate, HolidayOut, HolidayUpdate
+from app.services.pagination import MAX_PAGE_SIZE, paginate
 
 router = APIRouter(prefix="/api/holidays", tags=["holidays"])
 
 
 @router.get("/", response_model=list[HolidayOut])
 def list_holidays(
+    response: Response,
+    cursor: str | None = Query(None),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db),
-    _user: User = Depends(get_current_user),
+    _user: CurrentUser = Depends(get_current_user),
 ):
-    return db.query(Holiday).order_by(Holiday.start_date).all()
+    return paginate(
+        db.query(Holiday),
+        [(Holiday.start_date, False), (Holiday.id, False)],
+        lambda h: (h.start_date, h.id),
+        response, cursor, limit,
+    )
 
 
 @router.post("/", response_model=HolidayOut, status_code=201)
 def create_holiday(
     body: HolidayCreate,
     db: Session = Depends(get_db),
-    supervisor: User = Depends(require_supervisor),
+    supervisor: CurrentUser = Depends(require_supervisor),
 ):
     holiday = Holiday(created_by=supervisor.id, **body.model_dump())
     db.add(holiday)
@@ -36,7 +45,7 @@ def update_holiday(
     holiday_id: int,
     body: HolidayUpdate,
     db: Session = Depends(get_db),
-    _supervisor: User = Depends(require_supervisor),
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
     holiday = db.query(Holiday).filter(Holiday.id == holiday_id).first()
     if not holiday:
@@ -52,7 +61,7 @@ def update_holiday(
 def delete_holiday(
     holiday_id: int,
     db: Session = Depends(get_db),
-    _supervisor: User = Depends(require_supervisor),
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
     holiday = db.query(Holiday).filter(Holiday.id == holiday_id).first()
     if not holiday:
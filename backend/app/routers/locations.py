@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
+from app.auth.cache import CurrentUser
 from app.auth.dependencies import get_current_user, require_supervisor
 from app.database import get_db
 from app.models.location import Location
-from app.models.user import User
+from app.models.shift import Shift
 from app.schemas.location import LocationCreate, LocationOut, LocationUpdate
+from app.services.versioning import bump_versions_with_shifts
 
 router = APIRouter(prefix="/api/locations", tags=["locations"])
 
@@ -13,7 +15,7 @@ router = APIRouter(prefix="/api/locations", tags=["locations"])
 @router.get("/", response_model=list[LocationOut])
 def list_locations(
     db: Session = Depends(get_db),
-    _user: User = Depends(get_current_user),
+    _user: CurrentUser = Depends(get_current_user),
 ):
     return db.query(Location).filter(Location.is_active.is_(True)).order_by(Location.priority.desc()).all()
 
@@ -22,7 +24,7 @@ def list_locations(
 def create_location(
     body: LocationCreate,
     db: Session = Depends(get_db),
-    _supervisor: User = Depends(require_supervisor),
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
     if db.query(Location).filter(Location.name == body.name).first():
         raise HTTPException(status_code=400, detail="Location name already exists")
@@ -38,13 +40,17 @@ def update_location(
     location_id: int,
     body: LocationUpdate,
     db: Session = Depends(get_db),
-    _supervisor: User = Depends(require_supervisor),
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
     loc = db.query(Location).filter(Location.id == location_id).first()
     if not loc:
         raise HTTPException(status_code=404, detail="Location not found")
+    old_name = loc.name
     for field, value in body.model_dump(exclude_unset=True).items():
         setattr(loc, field, value)
+    # Shifts are shown with the location's name
+    if loc.name != old_name:
+        bump_versions_with_shifts(db, Shift.location_id == location_id)
     db.commit()
     db.refresh(loc)
     return loc
@@ -54,7 +60,7 @@ def update_location(
 def delete_location(
     location_id: int,
     db: Session = Depends(get_db),
-    _supervisor: User = Depends(require_supervisor),
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
     loc = db.query(Location).filter(Location.id == location_id).first()
     if not loc:
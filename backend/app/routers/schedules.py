@@ -1,19 +1,58 @@
 from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import distinct, extract, func, select
+from sqlalchemy.orm import Session, joinedload, selectinload
 
+from app.auth.cache import CurrentUser
 from app.auth.dependencies import get_current_user, require_supervisor
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.models.location import Location
 from app.models.schedule import Schedule, ScheduleStatus
 from app.models.shift import Shift
 from app.models.user import User
-from app.schemas.schedule import GenerateScheduleRequest, GenerateScheduleResponse, ScheduleOut, ShiftOut
-from app.services.scheduler import generate_schedule
+from app.schemas.schedule import (
+    GenerateScheduleRequest,
+    GenerateScheduleResponse,
+    ScheduleJobOut,
+    ScheduleOut,
+    ScheduleSummaryOut,
+    ShiftOut,
+)
+from app.services.diagnostics import GenerationTrace
+from app.services.jobs import Job, JobLimitReached
+from app.services.pagination import MAX_PAGE_SIZE, paginate
+from app.services.schedule_cache import cache_published_schedule, published_schedule_cache
+from app.services.scheduler import generate_schedule, schedule_jobs, start_generation_job
+from app.services.versioning import bump_schedule_version, etag_matches, not_modified, schedule_etag
 
 router = APIRouter(prefix="/api/schedules", tags=["schedules"])
 
 
+def _with_shifts():
+    """Load a schedule's shifts, with user and location names, in one extra query."""
+    return selectinload(Schedule.shifts).options(
+        joinedload(Shift.user).load_only(User.first_name, User.last_name),
+        joinedload(Shift.location).load_only(Location.name),
+    )
+
+
+def _schedule_out(schedule: Schedule) -> ScheduleOut:
+    out = ScheduleOut.model_validate(schedule)
+    out.shifts = _enrich_shifts(schedule.shifts)
+    return out
+
+
+def _get_schedule_with_shifts(db: Session, schedule_id: int) -> Schedule | None:
+    return (
+        db.query(Schedule)
+        .options(_with_shifts())
+        .filter(Schedule.id == schedule_id)
+        .populate_existing()
+        .first()
+    )
+
+
 def _enrich_shifts(shifts: list[Shift]) -> list[ShiftOut]:
     result = []
     for s in shifts:
@@ -30,69 +69,190 @@ def _enrich_shifts(shifts: list[Shift]) -> list[ShiftOut]:
 def generate(
     body: GenerateScheduleRequest,
     db: Session = Depends(get_db),
-    supervisor: User = Depends(require_supervisor),
+    supervisor: CurrentUser = Depends(require_supervisor),
+):
+    trace = GenerationTrace() if body.diagnostics else None
+    schedule_out, warnings, report = generate_schedule(
+        db,
+        body.week_start_date,
+        supervisor.id,
+        body.notes,
+        engine=body.engine,
+        solver=body.solver,
+        time_limit_ms=body.time_limit_ms,
+        improve_budget_ms=body.improve_budget_ms,
+        bypass_cache=body.bypass_cache,
+        trace=trace,
+    )
+    return GenerateScheduleResponse(
+        schedule=schedule_out,
+        warnings=warnings,
+        solver=report,
+        diagnostics=trace.report() if trace else None,
+    )
+
+
+def _job_out(job: Job) -> ScheduleJobOut:
+    result = job.result or {}
+    return ScheduleJobOut(
+        id=job.id,
+        status=job.status.value,
+        **job.progress,
+        warnings=job.warnings,
+        schedule_id=result.get("schedule_id"),
+        solver=result.get("solver"),
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+    )
+
+
+@router.post("/jobs", response_model=ScheduleJobOut, status_code=202)
+def start_generate_job(
+    body: GenerateScheduleRequest,
+    supervisor: CurrentUser = Depends(require_supervisor),
+):
+    try:
+        job = start_generation_job(
+            body.week_start_date,
+            supervisor.id,
+            body.notes,
+            engine=body.engine,
+            solver=body.solver,
+            time_limit_ms=body.time_limit_ms,
+            improve_budget_ms=body.improve_budget_ms,
+            bypass_cache=body.bypass_cache,
+        )
+    except JobLimitReached:
+        raise HTTPException(status_code=429, detail="Too many schedule generation jobs running")
+    return _job_out(job)
+
+
+@router.get("/jobs/{job_id}", response_model=ScheduleJobOut)
+def get_generate_job(
+    job_id: str,
+    _supervisor: CurrentUser = Depends(require_supervisor),
+):
+    job = schedule_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_out(job)
+
+
+@router.delete("/jobs/{job_id}", response_model=ScheduleJobOut)
+def cancel_generate_job(
+    job_id: str,
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
-    schedule, warnings = generate_schedule(db, body.week_start_date, supervisor.id, body.notes)
-    schedule_out = ScheduleOut.model_validate(schedule)
-    schedule_out.shifts = _enrich_shifts(schedule.shifts)
-    return GenerateScheduleResponse(schedule=schedule_out, warnings=warnings)
+    job = schedule_jobs.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_out(job)
 
 
 @router.get("/current", response_model=ScheduleOut | None)
 def get_current_schedule(
-    db: Session = Depends(get_db),
-    _user: User = Depends(get_current_user),
+    request: Request,
+    db: Session = Depends(get_read_db),
+    _user: CurrentUser = Depends(get_current_user),
 ):
-    schedule = (
-        db.query(Schedule)
+    current = (
+        db.query(Schedule.id, Schedule.version)
         .filter(Schedule.status == ScheduleStatus.published)
         .order_by(Schedule.week_start_date.desc())
         .first()
     )
-    if not schedule:
+    if not current:
         return None
-    out = ScheduleOut.model_validate(schedule)
-    out.shifts = _enrich_shifts(schedule.shifts)
-    return out
+    etag = schedule_etag(current.id, current.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    cached = published_schedule_cache.get((current.id, current.version))
+    if cached is None:
+        schedule = _get_schedule_with_shifts(db, current.id)
+        cached = cache_published_schedule(schedule.id, schedule.version, _schedule_out(schedule))
+    return Response(
+        content=cached.body,
+        media_type="application/json",
+        headers={"ETag": schedule_etag(cached.schedule_id, cached.version)},
+    )
 
 
-@router.get("/", response_model=list[ScheduleOut])
+def _minutes(t):
+    return extract("hour", t) * 60 + extract("minute", t)
+
+
+# Per-schedule shift totals, aggregated in SQL for the summary listing
+_shift_totals = (
+    select(
+        Shift.schedule_id,
+        func.count(Shift.id).label("shift_count"),
+        func.count(distinct(Shift.user_id)).label("student_count"),
+        func.sum(_minutes(Shift.end_time) - _minutes(Shift.start_time)).label("minutes"),
+    )
+    .group_by(Shift.schedule_id)
+    .subquery()
+)
+
+
+@router.get("/", response_model=list[ScheduleOut | ScheduleSummaryOut])
 def list_schedules(
+    response: Response,
     status: ScheduleStatus | None = Query(None),
-    db: Session = Depends(get_db),
-    _supervisor: User = Depends(require_supervisor),
+    include_shifts: bool = Query(False),
+    cursor: str | None = Query(None),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
-    q = db.query(Schedule).order_by(Schedule.week_start_date.desc())
+    keys = [(Schedule.week_start_date, True), (Schedule.id, True)]
+    if include_shifts:
+        q = db.query(Schedule).options(_with_shifts())
+        if status:
+            q = q.filter(Schedule.status == status)
+        schedules = paginate(q, keys, lambda s: (s.week_start_date, s.id), response, cursor, limit)
+        return [_schedule_out(s) for s in schedules]
+
+    q = db.query(
+        Schedule.id,
+        Schedule.week_start_date,
+        Schedule.status,
+        Schedule.generated_by,
+        Schedule.notes,
+        Schedule.created_at,
+        func.coalesce(_shift_totals.c.shift_count, 0).label("shift_count"),
+        func.coalesce(_shift_totals.c.student_count, 0).label("student_count"),
+        func.coalesce(_shift_totals.c.minutes, 0).label("minutes"),
+    ).outerjoin(_shift_totals, _shift_totals.c.schedule_id == Schedule.id)
     if status:
         q = q.filter(Schedule.status == status)
-    schedules = q.all()
-    result = []
-    for s in schedules:
-        out = ScheduleOut.model_validate(s)
-        out.shifts = _enrich_shifts(s.shifts)
-        result.append(out)
-    return result
+    rows = paginate(q, keys, lambda r: (r.week_start_date, r.id), response, cursor, limit)
+    return [
+        ScheduleSummaryOut(
+            **{k: v for k, v in row._mapping.items() if k != "minutes"},
+            total_hours=round(row.minutes / 60, 2),
+        )
+        for row in rows
+    ]
 
 
 @router.get("/{schedule_id}", response_model=ScheduleOut)
 def get_schedule(
     schedule_id: int,
-    db: Session = Depends(get_db),
-    _user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    _user: CurrentUser = Depends(get_current_user),
 ):
-    schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+    schedule = _get_schedule_with_shifts(db, schedule_id)
     if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
-    out = ScheduleOut.model_validate(schedule)
-    out.shifts = _enrich_shifts(schedule.shifts)
-    return out
+    return _schedule_out(schedule)
 
 
 @router.patch("/{schedule_id}/publish", response_model=ScheduleOut)
 def publish_schedule(
     schedule_id: int,
     db: Session = Depends(get_db),
-    _supervisor: User = Depends(require_supervisor),
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
     schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
     if not schedule:
@@ -100,39 +260,38 @@ def publish_schedule(
     if schedule.status != ScheduleStatus.draft:
         raise HTTPException(status_code=400, detail="Only draft schedules can be published")
     # Archive any currently published schedule
+    bump_schedule_version(db, Schedule.status == ScheduleStatus.published)
     db.query(Schedule).filter(Schedule.status == ScheduleStatus.published).update(
         {"status": ScheduleStatus.archived}
     )
     schedule.status = ScheduleStatus.published
+    bump_schedule_version(db, Schedule.id == schedule_id)
     db.commit()
-    db.refresh(schedule)
-    out = ScheduleOut.model_validate(schedule)
-    out.shifts = _enrich_shifts(schedule.shifts)
-    return out
+    published_schedule_cache.clear()
+    return _schedule_out(_get_schedule_with_shifts(db, schedule_id))
 
 
 @router.patch("/{schedule_id}/archive", response_model=ScheduleOut)
 def archive_schedule(
     schedule_id: int,
     db: Session = Depends(get_db),
-    _supervisor: User = Depends(require_supervisor),
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
     schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
     if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
     schedule.status = ScheduleStatus.archived
+    bump_schedule_version(db, Schedule.id == schedule_id)
     db.commit()
-    db.refresh(schedule)
-    out = ScheduleOut.model_validate(schedule)
-    out.shifts = _enrich_shifts(schedule.shifts)
-    return out
+    published_schedule_cache.clear()
+    return _schedule_out(_get_schedule_with_shifts(db, schedule_id))
 
 
 @router.delete("/{schedule_id}")
 def delete_schedule(
     schedule_id: int,
     db: Session = Depends(get_db),
-    _supervisor: User = Depends(require_supervisor),
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
     schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
     if not schedule:
@@ -1,14 +1,21 @@
 from datetime import date, time
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
 
+from app.auth.cache import CurrentUser
 from app.auth.dependencies import get_current_user, require_supervisor
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.models.location import Location
+from app.models.schedule import Schedule
 from app.models.shift import Shift, ShiftStatus
 from app.models.user import User
 from app.schemas.schedule import ShiftOut
+from app.services.pagination import MAX_PAGE_SIZE, paginate
+from app.services.schedule_cache import published_schedule_cache
+from app.services.versioning import bump_schedule_version, digest_etag, etag_matches, not_modified
 
 router = APIRouter(prefix="/api/shifts", tags=["shifts"])
 
@@ -42,14 +49,41 @@ def _enrich(s: Shift) -> ShiftOut:
 
 @router.get("/my", response_model=list[ShiftOut])
 def my_shifts(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    cursor: str | None = Query(None),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    shifts = (
-        db.query(Shift)
+    # Any change to one of these shifts bumps its schedule's version, and moving
+    # a shift away changes the count and id sum, so this aggregate is a safe ETag.
+    state = (
+        db.query(
+            func.count(Shift.id),
+            func.coalesce(func.sum(Shift.id), 0),
+            func.coalesce(func.sum(Schedule.version), 0),
+            func.max(Schedule.updated_at),
+        )
+        .join(Schedule, Shift.schedule_id == Schedule.id)
         .filter(Shift.user_id == current_user.id)
-        .order_by(Shift.actual_date, Shift.start_time)
-        .all()
+        .one()
+    )
+    etag = digest_etag(tuple(state), current_user.first_name, current_user.last_name, cursor, limit)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    shifts = paginate(
+        db.query(Shift)
+        .options(
+            joinedload(Shift.user).load_only(User.first_name, User.last_name),
+            joinedload(Shift.location).load_only(Location.name),
+        )
+        .filter(Shift.user_id == current_user.id),
+        [(Shift.actual_date, False), (Shift.start_time, False), (Shift.id, False)],
+        lambda s: (s.actual_date, s.start_time, s.id),
+        response, cursor, limit,
     )
     return [_enrich(s) for s in shifts]
 
@@ -58,11 +92,13 @@ def my_shifts(
 def create_shift(
     body: ShiftCreate,
     db: Session = Depends(get_db),
-    _supervisor: User = Depends(require_supervisor),
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
     shift = Shift(**body.model_dump())
     db.add(shift)
+    bump_schedule_version(db, Schedule.id == body.schedule_id)
     db.commit()
+    published_schedule_cache.clear()
     db.refresh(shift)
     return _enrich(shift)
 
@@ -72,14 +108,16 @@ def update_shift(
     shift_id: int,
     body: ShiftUpdate,
     db: Session = Depends(get_db),
-    _supervisor: User = Depends(require_supervisor),
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
     shift = db.query(Shift).filter(Shift.id == shift_id).first()
     if not shift:
         raise HTTPException(status_code=404, detail="Shift not found")
     for field, value in body.model_dump(exclude_unset=True).items():
         setattr(shift, field, value)
+    bump_schedule_version(db, Schedule.id == shift.schedule_id)
     db.commit()
+    published_schedule_cache.clear()
     db.refresh(shift)
     return _enrich(shift)
 
@@ -88,11 +126,13 @@ def update_shift(
 def delete_shift(
     shift_id: int,
     db: Session = Depends(get_db),
-    _supervisor: User = Depends(require_supervisor),
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
     shift = db.query(Shift).filter(Shift.id == shift_id).first()
     if not shift:
         raise HTTPException(status_code=404, detail="Shift not found")
     db.delete(shift)
+    bump_schedule_version(db, Schedule.id == shift.schedule_id)
     db.commit()
+    published_schedule_cache.clear()
     return {"message": "Shift deleted"}
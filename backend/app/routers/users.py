@@ -1,27 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException
+import csv
+import io
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.auth.cache import CurrentUser, invalidate_user
 from app.auth.dependencies import require_supervisor
 from app.database import get_db
+from app.models.shift import Shift
 from app.models.user import User
-from app.schemas.user import UserOut, UserUpdate
+from app.schemas.user import UserBulkCreateOut, UserOut, UserUpdate
+from app.services.pagination import MAX_PAGE_SIZE, paginate
+from app.services.user_provisioning import InvalidProvisioningFile, provision_users
+from app.services.versioning import bump_versions_with_shifts
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
 
 @router.get("/", response_model=list[UserOut])
 def list_users(
+    response: Response,
+    cursor: str | None = Query(None),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    _supervisor: CurrentUser = Depends(require_supervisor),
+):
+    return paginate(
+        db.query(User),
+        [(User.last_name, False), (User.id, False)],
+        lambda u: (u.last_name, u.id),
+        response, cursor, limit,
+    )
+
+
+@router.post("/bulk", response_model=UserBulkCreateOut, status_code=201)
+def bulk_create_users(
+    file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    _supervisor: User = Depends(require_supervisor),
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
-    return db.query(User).order_by(User.last_name).all()
+    """Create accounts from a CSV: email, first_name, last_name, password[, role, max_hours_per_week]."""
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return provision_users(db, stream)
+    except (UnicodeDecodeError, csv.Error, InvalidProvisioningFile) as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV file: {exc}")
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Some emails were registered while the import ran; retry it")
+    finally:
+        stream.detach()
 
 
 @router.get("/{user_id}", response_model=UserOut)
 def get_user(
     user_id: int,
     db: Session = Depends(get_db),
-    _supervisor: User = Depends(require_supervisor),
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
@@ -34,14 +69,19 @@ def update_user(
     user_id: int,
     body: UserUpdate,
     db: Session = Depends(get_db),
-    _supervisor: User = Depends(require_supervisor),
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    old_name = (user.first_name, user.last_name)
     for field, value in body.model_dump(exclude_unset=True).items():
         setattr(user, field, value)
+    # Shifts are shown with the user's name
+    if (user.first_name, user.last_name) != old_name:
+        bump_versions_with_shifts(db, Shift.user_id == user_id)
     db.commit()
+    invalidate_user(user_id)
     db.refresh(user)
     return user
 
@@ -50,11 +90,12 @@ def update_user(
 def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
-    _supervisor: User = Depends(require_supervisor),
+    _supervisor: CurrentUser = Depends(require_supervisor),
 ):
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     user.is_active = False
     db.commit()
+    invalidate_user(user_id)
     return {"message": "User deactivated"}
@@ -1,4 +1,4 @@
-from datetime import date, time
+from datetime import date, datetime, time
 
 from pydantic import BaseModel
 
@@ -31,3 +31,38 @@ class UserAvailabilityOut(BaseModel):
     user_id: int
     user_name: str
     slots: list[AvailabilityOut]
+
+
+class UserAvailabilityGridOut(BaseModel):
+    user_id: int
+    user_name: str
+    # day -> bitmask of available hours; bit h set = free from h:00 to h+1:00
+    days: dict[str, int]
+
+
+class AvailabilityImportError(BaseModel):
+    line: int
+    name: str
+    detail: str
+
+
+class AvailabilityImportOut(BaseModel):
+    rows: int
+    imported: list[UserAvailabilityOut]
+    errors: list[AvailabilityImportError]
+
+
+class AvailabilityImportJobOut(BaseModel):
+    id: str
+    status: str  # queued | running | succeeded | failed | cancelled
+    rows_parsed: int = 0
+    rows_matched: int = 0
+    rows_rejected: int = 0
+    duplicates: int = 0
+    users_imported: int | None = None
+    slots_imported: int | None = None
+    # The first MAX_REPORTED_ERRORS rejected rows
+    errors: list[AvailabilityImportError] = []
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class FeedLinkOut(BaseModel):
+    url: str
+    webcal_url: str
@@ -1,14 +1,20 @@
 from datetime import date, datetime, time
+from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from app.models.schedule import ScheduleStatus
-from app.models.shift import ShiftStatus
+from app.models.enums import ScheduleStatus, ShiftStatus
 
 
 class GenerateScheduleRequest(BaseModel):
     week_start_date: date
     notes: str | None = None
+    engine: Literal["heap", "vectorized"] = "heap"
+    solver: Literal["greedy", "optimal"] = "greedy"
+    time_limit_ms: int = Field(default=5000, ge=0, le=120_000)
+    improve_budget_ms: int = Field(default=0, ge=0, le=60_000)
+    bypass_cache: bool = False
+    diagnostics: bool = False
 
 
 class ShiftOut(BaseModel):
@@ -39,6 +45,18 @@ class ScheduleOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class ScheduleSummaryOut(BaseModel):
+    id: int
+    week_start_date: date
+    status: ScheduleStatus
+    generated_by: int | None
+    notes: str | None
+    created_at: datetime
+    shift_count: int
+    student_count: int
+    total_hours: float
+
+
 class ScheduleWarning(BaseModel):
     day: str
     time_slot: str
@@ -46,6 +64,53 @@ class ScheduleWarning(BaseModel):
     message: str
 
 
+class ImprovementReport(BaseModel):
+    budget_ms: int
+    elapsed_ms: float
+    moves_applied: int
+    unfilled_min_slots_before: int
+    unfilled_min_slots_after: int
+    fairness_spread_before: float
+    fairness_spread_after: float
+    objective_before: float
+    objective_after: float
+
+
+class SolverReport(BaseModel):
+    solver: str
+    status: str  # heuristic | optimal | time_limit | fallback
+    objective_value: float
+    optimality_gap: float | None = None
+    improvement: ImprovementReport | None = None
+    from_cache: bool = False
+
+
+class GenerationDiagnostics(BaseModel):
+    total_ms: float
+    phases_ms: dict[str, float]
+    sql_statements: int
+    sql_by_phase: dict[str, int]
+    candidate_evaluations: int
+    block_searches: int
+
+
 class GenerateScheduleResponse(BaseModel):
     schedule: ScheduleOut
     warnings: list[ScheduleWarning] = []
+    solver: SolverReport | None = None
+    diagnostics: GenerationDiagnostics | None = None
+
+
+class ScheduleJobOut(BaseModel):
+    id: str
+    status: str  # queued | running | succeeded | failed | cancelled
+    days_done: int = 0
+    days_total: int = 0
+    locations_done: int = 0
+    locations_total: int = 0
+    warnings: list[ScheduleWarning] = []
+    schedule_id: int | None = None
+    solver: SolverReport | None = None
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
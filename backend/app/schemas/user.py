@@ -2,7 +2,7 @@ from datetime import datetime
 
 from pydantic import BaseModel, EmailStr
 
-from app.models.user import UserRole
+from app.models.enums import UserRole
 
 
 class UserCreate(BaseModel):
@@ -43,3 +43,15 @@ class LoginRequest(BaseModel):
 class TokenResponse(BaseModel):
     message: str
     user: UserOut
+
+
+class UserProvisionError(BaseModel):
+    line: int
+    email: str
+    detail: str
+
+
+class UserBulkCreateOut(BaseModel):
+    rows: int
+    created: list[UserOut]
+    errors: list[UserProvisionError]
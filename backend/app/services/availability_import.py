@@ -0,0 +1,274 @@
+"""
+Bulk availability import from the supervisor CSV.
+
+The file format is ``Name, Max_Hours, Monday_8:00, Monday_9:00, ...`` with a
+``1`` in each hour column the student is free. Rows are read as a stream and
+matched against a user index loaded with one query; each row's hours become
+a per-day bitmask whose runs are the new availability slots. Rows that fail
+are reported individually and skipped. Everything else is written in one
+transaction, with one delete, one update and one insert, so a failed import
+leaves the previous availability untouched.
+
+Large files can instead be imported in the background: the upload is spooled
+to a temporary file and parsed in chunks on the import job pool, with
+progress published on the Job.
+"""
+
+import csv
+import io
+import shutil
+import tempfile
+from datetime import time
+from itertools import islice
+from typing import Any, BinaryIO, Iterable, NamedTuple, TextIO
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.availability import Availability
+from app.models.user import User
+from app.schemas.availability import (
+    AvailabilityImportError,
+    AvailabilityImportOut,
+    AvailabilityOut,
+    UserAvailabilityOut,
+)
+from app.services.jobs import Job, JobLimitReached, JobRunner
+from app.services.scheduler_core import runs_in_mask
+
+DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday")
+IMPORT_CHUNK_ROWS = 500
+# Row errors kept on a background job; the counts still cover every row
+MAX_REPORTED_ERRORS = 1000
+SPOOL_COPY_BYTES = 1024 * 1024
+
+import_jobs = JobRunner(settings.MAX_IMPORT_JOBS)
+
+
+class RowError(ValueError):
+    """A CSV row that cannot be imported; the message is reported back."""
+
+
+class InvalidImportFile(ValueError):
+    """The file as a whole cannot be imported."""
+
+
+class ParsedRow(NamedTuple):
+    user_id: int
+    max_hours: float | None
+    # day -> bitmask of available hours
+    masks: dict[str, int]
+
+
+class UserIndex:
+    """Every user's id by full name and by first name, from one query."""
+
+    def __init__(self, db: Session):
+        self.by_full_name: dict[tuple[str, str], int] = {}
+        self.by_first_name: dict[str, int] = {}
+        self.names: dict[int, str] = {}
+        rows = db.execute(select(User.id, User.first_name, User.last_name).order_by(User.id))
+        for user_id, first, last in rows:
+            self.by_full_name.setdefault((first, last), user_id)
+            self.by_first_name.setdefault(first, user_id)
+            self.names[user_id] = f"{first} {last}"
+
+    def resolve(self, name: str) -> int | None:
+        """Match "First Last ..." on first and last name, else the whole string on first name."""
+        parts = name.split()
+        user_id = self.by_full_name.get((parts[0], parts[1])) if len(parts) >= 2 else None
+        return user_id if user_id is not None else self.by_first_name.get(name)
+
+
+def hour_columns(fieldnames: Iterable[str]) -> list[tuple[str, str, int]]:
+    """(column, day, hour) for each ``Day_HH:MM`` column; anything else is ignored."""
+    columns = []
+    for column in fieldnames:
+        if "_" not in column or column in ("Name", "Max_Hours"):
+            continue
+        day, time_str = column.rsplit("_", 1)
+        if day not in DAYS:
+            continue
+        try:
+            hour = int(time_str.split(":")[0])
+        except ValueError:
+            continue
+        # The slot ends an hour later, which must still be a time of day
+        if 0 <= hour < 23:
+            columns.append((column, day, hour))
+    return columns
+
+
+def parse_row(row: dict, columns: list[tuple[str, str, int]], index: UserIndex) -> ParsedRow:
+    name = (row.get("Name") or "").strip()
+    if not name:
+        raise RowError("Missing name")
+    user_id = index.resolve(name)
+    if user_id is None:
+        raise RowError("No matching user")
+
+    max_hours = None
+    raw_max = (row.get("Max_Hours") or "").strip()
+    if raw_max:
+        try:
+            max_hours = float(raw_max)
+            if max_hours < 0:
+                raise ValueError
+        except ValueError:
+            raise RowError(f"Invalid Max_Hours: {raw_max!r}")
+
+    masks: dict[str, int] = {}
+    for column, day, hour in columns:
+        if str(row.get(column) or "").strip() == "1":
+            masks[day] = masks.get(day, 0) | (1 << hour)
+    return ParsedRow(user_id, max_hours, masks)
+
+
+def write_import(db: Session, parsed: list[ParsedRow], index: UserIndex) -> list[UserAvailabilityOut]:
+    """Replace the recurring availability of every parsed user; the caller commits."""
+    if not parsed:
+        return []
+    user_ids = [p.user_id for p in parsed]
+    db.execute(
+        delete(Availability)
+        .where(Availability.user_id.in_(user_ids), Availability.is_recurring.is_(True))
+        .execution_options(synchronize_session=False)
+    )
+    max_hours = [{"id": p.user_id, "max_hours_per_week": p.max_hours} for p in parsed if p.max_hours is not None]
+    if max_hours:
+        db.execute(update(User), max_hours)
+
+    values = [
+        {
+            "user_id": p.user_id,
+            "day_of_week": day,
+            "start_time": time(start, 0),
+            "end_time": time(end, 0),
+            "is_recurring": True,
+        }
+        for p in parsed
+        for day in DAYS
+        for start, end in runs_in_mask(p.masks.get(day, 0))
+    ]
+    slots_by_user: dict[int, list[AvailabilityOut]] = {uid: [] for uid in user_ids}
+    if values:
+        rows = db.execute(
+            insert(Availability).returning(
+                Availability.id,
+                Availability.user_id,
+                Availability.day_of_week,
+                Availability.start_time,
+                Availability.end_time,
+                Availability.effective_date,
+                Availability.is_recurring,
+            ),
+            values,
+        )
+        for r in rows:
+            slots_by_user[r.user_id].append(AvailabilityOut.model_validate(r))
+
+    # RETURNING order is not guaranteed for batched inserts
+    return [
+        UserAvailabilityOut(
+            user_id=uid,
+            user_name=index.names[uid],
+            slots=sorted(slots, key=lambda s: (DAYS.index(s.day_of_week), s.start_time)),
+        )
+        for uid, slots in slots_by_user.items()
+    ]
+
+
+class AvailabilityImport:
+    """Rows parsed so far from one CSV, deduplicated by user; ``commit`` writes them."""
+
+    def __init__(self, db: Session, fieldnames: Iterable[str] | None):
+        if not fieldnames or "Name" not in fieldnames:
+            raise InvalidImportFile("The CSV header has no Name column")
+        self.columns = hour_columns(fieldnames)
+        self.index = UserIndex(db)
+        self.parsed: dict[int, ParsedRow] = {}
+        self.errors: list[AvailabilityImportError] = []
+        self.rows = 0
+        self.duplicates = 0
+
+    def add(self, line: int, row: dict) -> None:
+        self.rows += 1
+        try:
+            result = parse_row(row, self.columns, self.index)
+        except RowError as exc:
+            name = (row.get("Name") or "").strip()
+            self.errors.append(AvailabilityImportError(line=line, name=name, detail=str(exc)))
+            return
+        # A later row for the same user replaces an earlier one
+        if self.parsed.pop(result.user_id, None) is not None:
+            self.duplicates += 1
+        self.parsed[result.user_id] = result
+
+    def commit(self, db: Session) -> list[UserAvailabilityOut]:
+        try:
+            imported = write_import(db, list(self.parsed.values()), self.index)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return imported
+
+
+def import_availability(db: Session, stream: TextIO) -> AvailabilityImportOut:
+    """Import a whole CSV in one transaction."""
+    reader = csv.DictReader(stream)
+    batch = AvailabilityImport(db, reader.fieldnames)
+    for row in reader:
+        batch.add(reader.line_num, row)
+    imported = batch.commit(db)
+    return AvailabilityImportOut(rows=batch.rows, imported=imported, errors=batch.errors)
+
+
+def spool_upload(upload: BinaryIO) -> BinaryIO:
+    """Copy an upload to an anonymous temporary file, which is deleted once closed."""
+    spool = tempfile.TemporaryFile(dir=settings.IMPORT_SPOOL_DIR)
+    shutil.copyfileobj(upload, spool, SPOOL_COPY_BYTES)
+    spool.seek(0)
+    return spool
+
+
+def start_import_job(spool: BinaryIO) -> Job:
+    """Import a spooled CSV on the import job pool; raises JobLimitReached when full.
+
+    Rows are parsed IMPORT_CHUNK_ROWS at a time, publishing progress and
+    honouring cancellation between chunks. Nothing is written until the
+    whole file is parsed, and then in a single transaction.
+    """
+
+    def work(job: Job) -> dict[str, Any]:
+        job.progress = {"rows_parsed": 0, "rows_matched": 0, "rows_rejected": 0, "duplicates": 0}
+        db = SessionLocal()
+        try:
+            stream = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+            reader = csv.DictReader(stream)
+            batch = AvailabilityImport(db, reader.fieldnames)
+            numbered = ((reader.line_num, row) for row in reader)
+            while chunk := list(islice(numbered, IMPORT_CHUNK_ROWS)):
+                for line, row in chunk:
+                    batch.add(line, row)
+                job.progress = {
+                    "rows_parsed": batch.rows,
+                    "rows_matched": batch.rows - len(batch.errors),
+                    "rows_rejected": len(batch.errors),
+                    "duplicates": batch.duplicates,
+                }
+                job.warnings = batch.errors[:MAX_REPORTED_ERRORS]
+                job.check_cancelled()
+            imported = batch.commit(db)
+        finally:
+            db.close()
+        return {"users_imported": len(imported), "slots_imported": sum(len(u.slots) for u in imported)}
+
+    try:
+        # The spool is closed (and so deleted) even if the job never starts
+        return import_jobs.submit("import_availability", work, cleanup=spool.close)
+    except JobLimitReached:
+        spool.close()
+        raise
@@ -0,0 +1,91 @@
+"""
+Bounded per-process caches.
+
+LRUCache is the one LRU map behind every in-process cache (generated drafts,
+rendered feed schedules, the current published schedule, verified tokens and
+user snapshots), optionally with entries that expire a fixed time after they
+are stored. clear_on_write empties a cache whenever a session writes to any
+of a set of models, whether through a flush or a bulk statement.
+"""
+
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Generic, Hashable, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.database import SessionLocal
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """Thread-safe LRU map of at most ``max_entries``; with ``ttl_seconds``,
+    entries also expire that long after they are stored."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float | None = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # key -> (monotonic expiry or None, value)
+        self._entries: OrderedDict[K, tuple[float | None, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] is not None and monotonic() > entry[0]:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: K, value: V, ttl_seconds: float | None = None) -> None:
+        """Store ``value``; ``ttl_seconds`` can only shorten the cache's own TTL."""
+        ttl = self.ttl_seconds
+        if ttl_seconds is not None:
+            ttl = ttl_seconds if ttl is None else min(ttl, ttl_seconds)
+        if self.max_entries <= 0 or (ttl is not None and ttl <= 0):
+            return
+        with self._lock:
+            self._entries[key] = (None if ttl is None else monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: K) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def clear_on_write(cache: LRUCache, *models: type, except_bulk_inserts: tuple[type, ...] = ()) -> None:
+    """Clear ``cache`` whenever a SessionLocal session writes to any of ``models``.
+
+    Bulk INSERT statements into ``except_bulk_inserts`` are ignored, for
+    tables whose bulk inserts cannot affect what is cached.
+    """
+
+    @event.listens_for(SessionLocal, "after_flush")
+    def _clear_on_flush(session: Session, _flush_context) -> None:
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            if isinstance(obj, models):
+                cache.clear()
+                return
+
+    @event.listens_for(SessionLocal, "do_orm_execute")
+    def _clear_on_bulk_write(state: ORMExecuteState) -> None:
+        if state.is_select or state.bind_mapper is None:
+            return
+        model = state.bind_mapper.class_
+        if state.is_insert and issubclass(model, except_bulk_inserts):
+            return
+        if issubclass(model, models):
+            cache.clear()
@@ -0,0 +1,90 @@
+"""
+Opt-in instrumentation for schedule generation.
+
+A GenerationTrace times named phases, counts the SQL statements issued from
+the generating thread (through a SQLAlchemy engine event) and collects
+solver counters such as candidate evaluations and block searches. Callers
+pass ``trace=None`` when diagnostics are off; the only remaining cost is one
+dictionary lookup per SQL statement.
+"""
+
+import json
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+from typing import ContextManager, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.schemas.schedule import GenerationDiagnostics
+
+logger = logging.getLogger("app.scheduler.diagnostics")
+
+# Thread id -> trace collecting on that thread
+_active: dict[int, "GenerationTrace"] = {}
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(*_args) -> None:
+    trace = _active.get(threading.get_ident())
+    if trace is not None:
+        trace.sql_by_phase[trace.current_phase] += 1
+
+
+class GenerationTrace:
+    """Phase timings, SQL counts and solver counters for one generation."""
+
+    def __init__(self) -> None:
+        self.phases_ms: dict[str, float] = {}
+        self.sql_by_phase: dict[str, int] = defaultdict(int)
+        self.counters: dict[str, int] = defaultdict(int)
+        self.current_phase = "other"
+        self._started = 0.0
+        self._total_ms = 0.0
+
+    def __enter__(self) -> "GenerationTrace":
+        self._started = perf_counter()
+        _active[threading.get_ident()] = self
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _active.pop(threading.get_ident(), None)
+        self._total_ms = (perf_counter() - self._started) * 1000
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a phase; SQL issued inside it is attributed to it. Phases may nest."""
+        outer = self.current_phase
+        self.current_phase = name
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.phases_ms[name] = self.phases_ms.get(name, 0.0) + (perf_counter() - started) * 1000
+            self.current_phase = outer
+
+    def add(self, counter: str, amount: int) -> None:
+        self.counters[counter] += amount
+
+    def report(self) -> GenerationDiagnostics:
+        return GenerationDiagnostics(
+            total_ms=round(self._total_ms, 3),
+            phases_ms={name: round(ms, 3) for name, ms in self.phases_ms.items()},
+            sql_statements=sum(self.sql_by_phase.values()),
+            sql_by_phase=dict(self.sql_by_phase),
+            candidate_evaluations=self.counters["candidate_evaluations"],
+            block_searches=self.counters["block_searches"],
+        )
+
+    def log(self, **context) -> None:
+        """Emit the report as one structured log record."""
+        payload = {**context, **self.report().model_dump()}
+        logger.info("schedule_generation %s", json.dumps(payload, default=str), extra={"diagnostics": payload})
+
+
+def phase(trace: GenerationTrace | None, name: str) -> ContextManager:
+    """``trace.phase(name)``, or a no-op when diagnostics are off."""
+    return trace.phase(name) if trace is not None else nullcontext()
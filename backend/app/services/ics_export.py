@@ -1,31 +1,46 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, time
 
 from icalendar import Calendar, Event
 
-from app.models.shift import Shift
 
-
-def shifts_to_ics(shifts: list[Shift], calendar_name: str = "IT Help Desk Schedule") -> bytes:
+def new_calendar(calendar_name: str = "IT Help Desk Schedule") -> Calendar:
     cal = Calendar()
     cal.add("prodid", "-//IT Help Desk Scheduler//EN")
     cal.add("version", "2.0")
     cal.add("x-wr-calname", calendar_name)
+    return cal
+
+
+def calendar_frame(cal: Calendar) -> tuple[bytes, bytes]:
+    """Serialized calendar split around where its events go, for writing events in between."""
+    footer = b"END:VCALENDAR\r\n"
+    return cal.to_ical()[: -len(footer)], footer
+
+
+def shift_event(
+    shift_id: int,
+    user_name: str,
+    location_name: str,
+    actual_date: date,
+    start_time: time,
+    end_time: time,
+    stamp: datetime | None = None,
+) -> Event:
+    """One shift as a VEVENT; the UID depends only on the shift id, so it is stable across exports."""
+    event = Event()
+    event.add("uid", f"shift-{shift_id}@it-helpdesk-scheduler")
+    if stamp is not None:
+        event.add("dtstamp", stamp)
+    event.add("summary", f"Help Desk: {location_name}")
+    event.add("description", f"Worker: {user_name}\nLocation: {location_name}")
+    event.add(
+        "dtstart",
+        datetime.combine(actual_date, start_time),
+    )
+    event.add(
+        "dtend",
+        datetime.combine(actual_date, end_time),
+    )
+    event.add("location", location_name)
+    return event
 
-    for shift in shifts:
-        event = Event()
-        location_name = shift.location.name if shift.location else "Unknown"
-        user_name = f"{shift.user.first_name} {shift.user.last_name}" if shift.user else "Unassigned"
-        event.add("summary", f"Help Desk: {location_name}")
-        event.add("description", f"Worker: {user_name}\nLocation: {location_name}")
-        event.add(
-            "dtstart",
-            datetime.combine(shift.actual_date, shift.start_time),
-        )
-        event.add(
-            "dtend",
-            datetime.combine(shift.actual_date, shift.end_time),
-        )
-        event.add("location", location_name)
-        cal.add_component(event)
-
-    return cal.to_ical()
@@ -0,0 +1,161 @@
+"""
+Subscribable per-user and per-location ICS feeds.
+
+A feed spans the newest published or archived schedule of each week, when
+it has shifts for the feed's subject, from FEED_WEEKS weeks back onwards, so the schedules a feed needs
+stay within the render cache. Rendering happens once per schedule version: the first request
+that needs a schedule at a new version renders all of its shifts into VEVENT
+bytes grouped by user and by location, and every feed touching that
+schedule reuses them until the version changes (renaming a user or location
+bumps the versions of the schedules showing it). Serving a feed is then one
+small query for the subject's schedule versions plus a byte concatenation.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import NamedTuple
+
+from sqlalchemy import exists, func, select
+from sqlalchemy.orm import Session, aliased
+
+from app.config import settings
+from app.models.location import Location
+from app.models.schedule import Schedule, ScheduleStatus
+from app.models.shift import Shift
+from app.models.user import User
+from app.services.cache import LRUCache
+from app.services.ics_export import calendar_frame, new_calendar, shift_event
+
+FEED_KINDS = ("user", "location")
+FEED_STATUSES = (ScheduleStatus.published, ScheduleStatus.archived)
+
+
+class FeedHead(NamedTuple):
+    schedule_id: int
+    version: int
+    updated_at: datetime
+
+
+class _RenderedSchedule(NamedTuple):
+    version: int
+    by_user: dict[int, bytes]
+    by_location: dict[int, bytes]
+
+
+# Schedule id -> its shifts rendered at one version
+feed_cache: LRUCache[int, _RenderedSchedule] = LRUCache(settings.FEED_CACHE_SCHEDULES)
+
+
+def _subject_column(kind: str):
+    return Shift.user_id if kind == "user" else Shift.location_id
+
+
+def newest_of_week(statuses=FEED_STATUSES):
+    """Condition keeping only the newest schedule in each week among ``statuses``,
+    so a week that was regenerated and republished is not exported twice."""
+    other = aliased(Schedule)
+    return Schedule.id == (
+        select(func.max(other.id))
+        .where(other.week_start_date == Schedule.week_start_date, other.status.in_(statuses))
+        .scalar_subquery()
+    )
+
+
+def feed_heads(db: Session, kind: str, subject_id: int) -> list[FeedHead]:
+    """Versions of the schedules a feed covers, oldest week first."""
+    subject = _subject_column(kind)
+    since = date.today() - timedelta(weeks=settings.FEED_WEEKS)
+    rows = db.execute(
+        select(Schedule.id, Schedule.version, Schedule.updated_at)
+        .where(
+            Schedule.status.in_(FEED_STATUSES),
+            Schedule.week_start_date >= since,
+            newest_of_week(),
+            exists().where(Shift.schedule_id == Schedule.id, subject == subject_id),
+        )
+        .order_by(Schedule.week_start_date, Schedule.id)
+    )
+    return [FeedHead(*row) for row in rows]
+
+
+def last_modified(heads: list[FeedHead]) -> datetime | None:
+    stamps = [_utc(h.updated_at) for h in heads if h.updated_at is not None]
+    return max(stamps) if stamps else None
+
+
+def render_feed(db: Session, kind: str, subject_id: int, heads: list[FeedHead], calendar_name: str) -> bytes:
+    """The full VCALENDAR for a feed, rendering only schedules not cached at their current version."""
+    rendered = {h.schedule_id: _cached_render(h) for h in heads}
+    missing = [h for h in heads if rendered[h.schedule_id] is None]
+    if missing:
+        rendered.update(_render_schedules(db, missing))
+
+    header, footer = _calendar_frame(calendar_name)
+    parts = [header]
+    for h in heads:
+        entry = rendered[h.schedule_id]
+        chunks = entry.by_user if kind == "user" else entry.by_location
+        parts.append(chunks.get(subject_id, b""))
+    parts.append(footer)
+    return b"".join(parts)
+
+
+def _cached_render(head: FeedHead) -> _RenderedSchedule | None:
+    entry = feed_cache.get(head.schedule_id)
+    return entry if entry is not None and entry.version == head.version else None
+
+
+def _render_schedules(db: Session, heads: list[FeedHead]) -> dict[int, _RenderedSchedule]:
+    """Render every shift of the given schedules with one joined query."""
+    stamps = {h.schedule_id: _utc(h.updated_at) for h in heads}
+    rows = db.execute(
+        select(
+            Shift.id,
+            Shift.schedule_id,
+            Shift.user_id,
+            Shift.location_id,
+            Shift.actual_date,
+            Shift.start_time,
+            Shift.end_time,
+            User.first_name,
+            User.last_name,
+            Location.name,
+        )
+        .join(User, Shift.user_id == User.id)
+        .join(Location, Shift.location_id == Location.id)
+        .where(Shift.schedule_id.in_(stamps))
+        .order_by(Shift.actual_date, Shift.start_time, Shift.id)
+    )
+    by_user: dict[int, dict[int, list[bytes]]] = defaultdict(lambda: defaultdict(list))
+    by_location: dict[int, dict[int, list[bytes]]] = defaultdict(lambda: defaultdict(list))
+    for r in rows:
+        ics = shift_event(
+            r.id, f"{r.first_name} {r.last_name}", r.name,
+            r.actual_date, r.start_time, r.end_time, stamps[r.schedule_id],
+        ).to_ical()
+        by_user[r.schedule_id][r.user_id].append(ics)
+        by_location[r.schedule_id][r.location_id].append(ics)
+
+    result = {}
+    for h in heads:
+        entry = _RenderedSchedule(
+            h.version,
+            {uid: b"".join(chunks) for uid, chunks in by_user[h.schedule_id].items()},
+            {lid: b"".join(chunks) for lid, chunks in by_location[h.schedule_id].items()},
+        )
+        feed_cache.put(h.schedule_id, entry)
+        result[h.schedule_id] = entry
+    return result
+
+
+def _calendar_frame(calendar_name: str) -> tuple[bytes, bytes]:
+    cal = new_calendar(calendar_name)
+    # Hint to calendar apps how often to poll
+    cal.add("refresh-interval", timedelta(minutes=15), parameters={"VALUE": "DURATION"})
+    cal.add("x-published-ttl", "PT15M")
+    return calendar_frame(cal)
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite returns naive timestamps; the server clock is UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
@@ -0,0 +1,132 @@
+"""
+In-process background jobs.
+
+A JobRunner owns a small thread pool and a registry of recent jobs. Work is
+a callable taking the Job; it reports progress by updating ``job.progress``
+and ``job.warnings`` and should call ``job.check_cancelled()`` at safe
+points. Finished jobs are kept for ``retention_seconds`` so clients can poll
+their result. State is per process, so with several workers a client must
+poll the worker that accepted the job.
+"""
+
+import enum
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+
+class JobStatus(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+    cancelled = "cancelled"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested."""
+
+
+class JobLimitReached(Exception):
+    """Raised by JobRunner.submit when the concurrent job cap is reached."""
+
+
+class Job:
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = JobStatus.queued
+        self.progress: dict[str, int] = {}
+        self.warnings: list[Any] = []
+        self.result: dict[str, Any] | None = None
+        self.error: str | None = None
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at: datetime | None = None
+        self._cancel = threading.Event()
+
+    @property
+    def active(self) -> bool:
+        return self.status in (JobStatus.queued, JobStatus.running)
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation was requested, for work that cannot raise mid-step."""
+        return self._cancel.is_set()
+
+    def check_cancelled(self) -> None:
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def _finish(self, status: JobStatus) -> None:
+        self.status = status
+        self.finished_at = datetime.now(timezone.utc)
+
+
+class JobRunner:
+    def __init__(self, max_concurrent: int, retention_seconds: int = 3600):
+        self.max_concurrent = max_concurrent
+        self.retention = timedelta(seconds=retention_seconds)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="job")
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        kind: str,
+        work: Callable[[Job], dict[str, Any] | None],
+        cleanup: Callable[[], None] | None = None,
+    ) -> Job:
+        """Queue ``work``; raises JobLimitReached if max_concurrent jobs are active.
+
+        ``cleanup`` runs once the job is finished however it ends, including
+        when it is cancelled before ``work`` starts.
+        """
+        with self._lock:
+            self._prune()
+            if sum(job.active for job in self._jobs.values()) >= self.max_concurrent:
+                raise JobLimitReached()
+            job = Job(kind)
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, work, cleanup)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Job | None:
+        """Request cancellation. Queued jobs never start; running jobs stop at
+        their next check_cancelled()."""
+        job = self._jobs.get(job_id)
+        if job and job.active:
+            job._cancel.set()
+        return job
+
+    def _run(
+        self,
+        job: Job,
+        work: Callable[[Job], dict[str, Any] | None],
+        cleanup: Callable[[], None] | None,
+    ) -> None:
+        try:
+            job.check_cancelled()
+            job.status = JobStatus.running
+            job.result = work(job)
+            job._finish(JobStatus.succeeded)
+        except JobCancelled:
+            job._finish(JobStatus.cancelled)
+        except Exception as exc:
+            job.error = str(exc) or exc.__class__.__name__
+            job._finish(JobStatus.failed)
+        finally:
+            if cleanup:
+                cleanup()
+
+    def _prune(self) -> None:
+        cutoff = datetime.now(timezone.utc) - self.retention
+        for job_id in [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at and job.finished_at < cutoff
+        ]:
+            del self._jobs[job_id]
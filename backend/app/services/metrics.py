@@ -0,0 +1,243 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Collectors live in this process only (each worker exposes its own), so no
+metrics service or client library is needed; /api/metrics renders them.
+
+Recorded here:
+- per-route request latency, response size and in-flight requests, by
+  MetricsMiddleware
+- SQL statement durations, through engine cursor events
+- connection pool checkout wait, through timed_pool_class
+"""
+
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in sorted(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def _samples(self) -> list[str]:
+        lines = []
+        for key, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+registry: list[_Metric] = []
+
+
+def render() -> str:
+    """All collectors in Prometheus text format."""
+    lines: list[str] = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+http_requests = Counter(
+    "http_requests_total", "HTTP requests handled.", ("method", "route", "status")
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency until the response is sent.", ("method", "route")
+)
+http_response_size = Histogram(
+    "http_response_size_bytes", "HTTP response body size.", ("method", "route"), buckets=SIZE_BUCKETS
+)
+http_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled.", ("method",)
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time.", ("statement",), buckets=DB_BUCKETS
+)
+db_pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection.", buckets=DB_BUCKETS
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, size and concurrency per route template.
+
+    Requests are labelled with the matched route's path template (so
+    ``/api/schedules/{schedule_id}`` is one series); unmatched paths share the
+    ``unmatched`` label to keep the series count bounded. Streaming responses
+    are measured until their last body chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        started = perf_counter()
+        status = 500
+        size = 0
+        # The route is only known once routing ran, so in-flight is per method
+        http_in_flight.inc(method=method)
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.dec(method=method)
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            http_requests.inc(method=method, route=template, status=str(status))
+            http_request_duration.observe(perf_counter() - started, method=method, route=template)
+            http_response_size.observe(size, method=method, route=template)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _query_started(conn, _cursor, _statement, _parameters, _context, _executemany) -> None:
+    conn.info.setdefault("metrics_query_started", []).append(perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _query_finished(conn, _cursor, statement, _parameters, _context, _executemany) -> None:
+    started = conn.info["metrics_query_started"].pop()
+    db_query_duration.observe(perf_counter() - started, statement=_statement_kind(statement))
+
+
+@event.listens_for(Engine, "handle_error")
+def _query_failed(context) -> None:
+    conn = context.connection
+    if conn is not None and conn.info.get("metrics_query_started"):
+        started = conn.info["metrics_query_started"].pop()
+        db_query_duration.observe(perf_counter() - started, statement="error")
+
+
+def _statement_kind(statement: str) -> str:
+    verb = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    return verb if verb in ("select", "insert", "update", "delete") else "other"
+
+
+def timed_pool_class(pool_class: type[Pool]) -> type[Pool]:
+    """Subclass of ``pool_class`` that records how long each checkout waits."""
+
+    class TimedPool(pool_class):
+        def connect(self):
+            started = perf_counter()
+            try:
+                return super().connect()
+            finally:
+                db_pool_checkout_wait.observe(perf_counter() - started)
+
+    TimedPool.__name__ = f"Timed{pool_class.__name__}"
+    return TimedPool
@@ -0,0 +1,84 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A page is the first ``limit`` rows after the cursor in the endpoint's sort
+order, so every page costs the same however deep it is. The cursor is an
+opaque URL-safe token holding the sort key of the last row returned; the
+next one is sent back in the ``X-Next-Cursor`` response header and is absent
+on the last page. Without ``limit`` a page holds DEFAULT_PAGE_SIZE rows, so
+no request returns an unbounded list; clients follow the header for more.
+"""
+
+import base64
+import json
+from datetime import date, datetime, time
+from typing import Any, Callable, Sequence
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+from sqlalchemy.sql import ColumnElement
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# (column, descending)
+SortKey = tuple[ColumnElement, bool]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, time)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[SortKey]) -> list[Any]:
+    """Decode a cursor back into typed key values; 400 if it is malformed."""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(raw, list) or len(raw) != len(keys):
+            raise ValueError
+        return [_from_json(value, column) for value, (column, _) in zip(raw, keys)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _from_json(value: Any, column: ColumnElement) -> Any:
+    python_type = column.type.python_type
+    if python_type in (date, datetime, time):
+        return python_type.fromisoformat(value)
+    return python_type(value)
+
+
+def _after(keys: Sequence[SortKey], values: Sequence[Any]) -> ColumnElement:
+    """Rows strictly after ``values`` in the order given by ``keys``."""
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        equal = [col == v for (col, _), v in zip(keys[:i], values[:i])]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal, step))
+    return or_(*clauses)
+
+
+def paginate(
+    query: Query,
+    keys: Sequence[SortKey],
+    row_key: Callable[[Any], Sequence[Any]],
+    response: Response,
+    cursor: str | None,
+    limit: int | None,
+) -> list:
+    """Order ``query`` by ``keys`` and return one page, setting the next-cursor header.
+
+    ``keys`` must end in a unique column so the order is total; ``row_key``
+    extracts the same values from a result row.
+    """
+    query = query.order_by(*(col.desc() if descending else col.asc() for col, descending in keys))
+    if cursor is not None:
+        query = query.filter(_after(keys, decode_cursor(cursor, keys)))
+    limit = limit or DEFAULT_PAGE_SIZE
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(row_key(rows[-1]))
+    return rows
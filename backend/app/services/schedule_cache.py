@@ -0,0 +1,32 @@
+"""
+Process-local cache of the current published schedule.
+
+Holds the ScheduleOut of the latest published schedule together with its
+serialized JSON, keyed by (schedule id, version). Every change a client can
+see in the schedule, including renaming a user or location its shifts show,
+bumps the version in the database, and every read checks the cached key
+against the database's current (id, version) first, so no worker serves a
+stale entry whichever worker made the change.
+"""
+
+from typing import NamedTuple
+
+from app.schemas.schedule import ScheduleOut
+from app.services.cache import LRUCache
+
+
+class CachedSchedule(NamedTuple):
+    schedule_id: int
+    version: int
+    schedule: ScheduleOut
+    body: bytes
+
+
+# (schedule id, version) -> the serialized schedule; only the latest is kept
+published_schedule_cache: LRUCache[tuple[int, int], CachedSchedule] = LRUCache(1)
+
+
+def cache_published_schedule(schedule_id: int, version: int, schedule: ScheduleOut) -> CachedSchedule:
+    entry = CachedSchedule(schedule_id, version, schedule, schedule.model_dump_json().encode())
+    published_schedule_cache.put((schedule_id, version), entry)
+    return entry
@@ -1,30 +1,62 @@
 """
-Core scheduling algorithm — improved greedy approach ported from app.py.
-
-Improvements over prototype:
-1. Variable shift blocks (2-5 hour contiguous blocks instead of 1-hour slots)
-2. Scoring function: fairness ratio, day spreading, shift length, location continuity
-3. Priority-based location filling (highest priority first)
-4. Holiday aware
-5. Warnings for understaffed slots
+Database adapter for the scheduling core.
+
+Loads active locations, students, availability and holidays as plain column
+rows (no ORM entities, so the identity map stays empty during the search),
+runs app.services.scheduler_core.solve_week and persists the result as a
+draft Schedule with one bulk insert. The response model is built from the
+in-memory result, so nothing is read back after the write.
+
+Drafts are cached by a fingerprint of everything the solver reads, so
+generating the same week again with nothing changed returns the existing
+draft. Any write to locations, users, availability or holidays clears the
+cache, as does editing shifts, since that changes the cached drafts themselves.
 """
 
-from datetime import date, time, timedelta
+import hashlib
 from collections import defaultdict
+from datetime import date, time, timedelta
+from typing import Any, Callable
 
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, selectinload
+
+from app.config import settings
+from app.database import SessionLocal
 
 from app.models.availability import Availability
 from app.models.holiday import Holiday
 from app.models.location import Location
 from app.models.schedule import Schedule, ScheduleStatus
-from app.models.shift import Shift
+from app.models.shift import Shift, ShiftStatus
 from app.models.user import User, UserRole
-from app.schemas.schedule import ScheduleWarning
-
-DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
-HOUR_START = 8
-HOUR_END = 18  # 6 PM
+from app.schemas.schedule import ScheduleOut, ScheduleWarning, ShiftOut, SolverReport
+from app.services.cache import LRUCache, clear_on_write
+from app.services.diagnostics import GenerationTrace, phase
+from app.services.jobs import Job, JobCancelled, JobRunner
+from app.services.scheduler_core import (
+    DAYS,
+    CancelledCheck,
+    HOUR_END,
+    HOUR_START,
+    LocationInput,
+    ProgressCallback,
+    StudentInput,
+    hours_mask,
+    solve_week,
+)
+
+schedule_jobs = JobRunner(settings.MAX_SCHEDULE_JOBS)
+
+
+# Fingerprint -> (draft schedule id, warnings, solver report)
+generation_cache: LRUCache[str, tuple[int, list[ScheduleWarning], SolverReport]] = LRUCache(
+    settings.GENERATION_CACHE_SIZE, settings.GENERATION_CACHE_TTL_SECONDS
+)
+
+# Writing to a table the solver reads, or to the drafts' own shifts, invalidates
+# cached drafts. Bulk shift inserts only come from generation, into a new schedule.
+clear_on_write(generation_cache, Location, User, Availability, Holiday, Shift, except_bulk_inserts=(Shift,))
 
 
 def generate_schedule(
@@ -32,264 +64,296 @@ def generate_schedule(
     week_start: date,
     generated_by: int,
     notes: str | None = None,
-) -> tuple[Schedule, list[ScheduleWarning]]:
-    """Generate a weekly schedule using an improved scored greedy algorithm."""
-
-    # Gather data
-    locations = (
-        db.query(Location)
-        .filter(Location.is_active.is_(True))
-        .order_by(Location.priority.desc())
-        .all()
+    engine: str = "heap",
+    solver: str = "greedy",
+    time_limit_ms: int = 5000,
+    improve_budget_ms: int = 0,
+    bypass_cache: bool = False,
+    on_loaded: Callable[[int, int], None] | None = None,
+    progress: ProgressCallback | None = None,
+    cancelled: CancelledCheck | None = None,
+    trace: GenerationTrace | None = None,
+) -> tuple[ScheduleOut, list[ScheduleWarning], SolverReport]:
+    """Generate a weekly schedule; see solve_week for the solver options.
+
+    If a draft generated from identical inputs and options is still cached
+    (and still a draft), it is returned instead, with ``report.from_cache``
+    set; ``bypass_cache`` always generates a new draft.
+
+    ``on_loaded`` receives the number of open days and active locations once
+    the inputs are loaded; ``progress`` and ``cancelled`` are passed through
+    to solve_week. If ``cancelled()`` is true once the solve returns,
+    JobCancelled is raised before anything is written.
+
+    With a ``trace``, every phase is timed and its SQL statements counted;
+    the result is logged and available from ``trace.report()``.
+    """
+    options = dict(
+        notes=notes, engine=engine, solver=solver, time_limit_ms=time_limit_ms,
+        improve_budget_ms=improve_budget_ms, bypass_cache=bypass_cache,
+        on_loaded=on_loaded, progress=progress, cancelled=cancelled,
     )
-    students = (
-        db.query(User)
-        .filter(User.role == UserRole.student, User.is_active.is_(True))
-        .all()
+    if trace is None:
+        return _generate_schedule(db, week_start, generated_by, trace=None, **options)
+    with trace:
+        schedule, warnings, report = _generate_schedule(db, week_start, generated_by, trace=trace, **options)
+    trace.log(
+        week_start=week_start, schedule_id=schedule.id, engine=engine, solver=solver,
+        shifts=len(schedule.shifts), from_cache=report.from_cache,
     )
-    holidays = _get_holidays_for_week(db, week_start)
+    return schedule, warnings, report
 
-    # Build availability lookup: user_id -> day -> set of available hours
-    avail_map = _build_availability_map(db, [s.id for s in students])
 
-    # Track per-student state
-    student_state: dict[int, dict] = {}
+def _generate_schedule(
+    db: Session,
+    week_start: date,
+    generated_by: int,
+    notes: str | None,
+    engine: str,
+    solver: str,
+    time_limit_ms: int,
+    improve_budget_ms: int,
+    bypass_cache: bool,
+    on_loaded: Callable[[int, int], None] | None,
+    progress: ProgressCallback | None,
+    cancelled: CancelledCheck | None,
+    trace: GenerationTrace | None,
+) -> tuple[ScheduleOut, list[ScheduleWarning], SolverReport]:
+    # Gather data
+    with phase(trace, "load_locations"):
+        location_rows = (
+            db.query(Location.id, Location.name, Location.min_staff, Location.max_staff, Location.priority)
+            .filter(Location.is_active.is_(True))
+            .order_by(Location.priority.desc())
+            .all()
+        )
+    locations = [
+        LocationInput(row.id, row.name, row.min_staff, row.max_staff) for row in location_rows
+    ]
+    students: list[StudentInput] = []
+    student_names: dict[int, str] = {}
+    with phase(trace, "load_students"):
+        for row in db.query(User.id, User.first_name, User.last_name, User.max_hours_per_week).filter(
+            User.role == UserRole.student, User.is_active.is_(True)
+        ):
+            students.append(StudentInput(row.id, row.max_hours_per_week, {}))
+            student_names[row.id] = f"{row.first_name} {row.last_name}"
+    with phase(trace, "load_holidays"):
+        holidays = _get_holidays_for_week(db, week_start)
+
+    # Build availability lookup: user_id -> day -> bitmask of available hours
+    with phase(trace, "build_availability_map"):
+        avail_map = _build_availability_map(db, [s.id for s in students])
     for s in students:
-        student_state[s.id] = {
-            "user": s,
-            "max_hours": s.max_hours_per_week,
-            "assigned_hours": 0.0,
-            "days_assigned": defaultdict(float),  # day -> hours on that day
-            "last_location_by_day": {},  # day -> last location_id
-        }
+        s.masks = avail_map.get(s.id, {})
+    open_days = [
+        day for day_idx, day in enumerate(DAYS)
+        if week_start + timedelta(days=day_idx) not in holidays
+    ]
+
+    fingerprint = _fingerprint(
+        week_start, generated_by, notes, location_rows, students, open_days,
+        (engine, solver, time_limit_ms, improve_budget_ms),
+    )
+    if not bypass_cache:
+        with phase(trace, "cache_lookup"):
+            cached = _cached_draft(db, fingerprint)
+        if cached:
+            return cached
+
+    if on_loaded:
+        on_loaded(len(open_days), len(locations))
+
+    with phase(trace, "solve"):
+        result = solve_week(
+            students,
+            locations,
+            open_days,
+            engine=engine,
+            solver=solver,
+            time_limit_ms=time_limit_ms,
+            improve_budget_ms=improve_budget_ms,
+            progress=progress,
+            cancelled=cancelled,
+            trace=trace,
+        )
+    # The optional phases stop early on cancellation rather than raising
+    if cancelled and cancelled():
+        raise JobCancelled()
 
     # Create the schedule record
-    schedule = Schedule(
-        week_start_date=week_start,
-        status=ScheduleStatus.draft,
-        generated_by=generated_by,
-        notes=notes,
-    )
-    db.add(schedule)
-    db.flush()  # get the ID
-
-    warnings: list[ScheduleWarning] = []
-    all_shifts: list[Shift] = []
-
-    for day_idx, day in enumerate(DAYS):
-        actual = week_start + timedelta(days=day_idx)
-
-        # Skip holidays
-        if actual in holidays:
-            continue
-
-        for location in locations:
-            # Try to assign contiguous blocks for this location/day
-            assigned_for_slot = _assign_location_day(
-                db=db,
-                schedule=schedule,
-                location=location,
-                day=day,
-                actual_date=actual,
-                avail_map=avail_map,
-                student_state=student_state,
-                warnings=warnings,
+    with phase(trace, "persist"):
+        schedule_row = db.execute(
+            insert(Schedule)
+            .values(
+                week_start_date=week_start,
+                status=ScheduleStatus.draft,
+                generated_by=generated_by,
+                notes=notes,
             )
-            all_shifts.extend(assigned_for_slot)
-
-    db.commit()
-    db.refresh(schedule)
-    return schedule, warnings
-
-
-def _assign_location_day(
-    db: Session,
-    schedule: Schedule,
-    location: Location,
-    day: str,
-    actual_date: date,
-    avail_map: dict[int, dict[str, set[int]]],
-    student_state: dict[int, dict],
-    warnings: list[ScheduleWarning],
-) -> list[Shift]:
-    """Assign shifts for a single location on a single day."""
-    shifts_created = []
-    slots_needed = location.min_staff
-
-    # For each staff slot we need to fill at this location
-    for _slot_idx in range(location.max_staff):
-        best_student = None
-        best_score = float("-inf")
-        best_block = None
-
-        for uid, state in student_state.items():
-            # Get available hours for this student on this day
-            available_hours = avail_map.get(uid, {}).get(day, set())
-            if not available_hours:
-                continue
-
-            # Find the best contiguous block (2-5 hours)
-            block = _find_best_block(available_hours, state, HOUR_START, HOUR_END)
-            if not block:
-                continue
-
-            block_len = block[1] - block[0]
-            remaining = state["max_hours"] - state["assigned_hours"]
-            if block_len > remaining:
-                # Trim block to fit remaining hours
-                block = (block[0], block[0] + int(remaining))
-                block_len = block[1] - block[0]
-            if block_len < 1:
-                continue
-
-            score = _score_assignment(state, block_len, day, location.id)
-            if score > best_score:
-                best_score = score
-                best_student = uid
-                best_block = block
-
-        if best_student and best_block:
-            block_len = best_block[1] - best_block[0]
-            shift = Shift(
-                schedule_id=schedule.id,
-                user_id=best_student,
-                location_id=location.id,
-                day_of_week=day,
-                start_time=time(best_block[0], 0),
-                end_time=time(best_block[1], 0),
-                actual_date=actual_date,
+            .returning(Schedule.id, Schedule.created_at)
+        ).one()
+
+        shift_rows = [
+            {
+                "schedule_id": schedule_row.id,
+                "user_id": a.user_id,
+                "location_id": a.location_id,
+                "day_of_week": a.day,
+                "start_time": time(a.start_hour, 0),
+                "end_time": time(a.end_hour, 0),
+                "actual_date": week_start + timedelta(days=DAYS.index(a.day)),
+                "status": ShiftStatus.scheduled,
+            }
+            for a in result.assignments
+        ]
+        # A student has at most one shift starting at a given hour of a day, which
+        # keys RETURNING rows back to their input rows; not asking the driver for
+        # parameter order keeps the insert batched on every backend.
+        shift_ids: dict[tuple[int, str, time], int] = {}
+        if shift_rows:
+            returned = db.execute(
+                insert(Shift).returning(Shift.id, Shift.user_id, Shift.day_of_week, Shift.start_time),
+                shift_rows,
             )
-            db.add(shift)
-            shifts_created.append(shift)
-
-            # Update state
-            st = student_state[best_student]
-            st["assigned_hours"] += block_len
-            st["days_assigned"][day] += block_len
-            st["last_location_by_day"][day] = location.id
-
-            # Remove assigned hours from availability so they aren't double-booked
-            avail_hours = avail_map[best_student][day]
-            for h in range(best_block[0], best_block[1]):
-                avail_hours.discard(h)
-        else:
-            if _slot_idx < slots_needed:
-                warnings.append(
-                    ScheduleWarning(
-                        day=day,
-                        time_slot=f"{HOUR_START}:00-{HOUR_END}:00",
-                        location=location.name,
-                        message=f"Could not fill minimum staffing (need {slots_needed}, filled {_slot_idx})",
-                    )
+            shift_ids = {(r.user_id, r.day_of_week, r.start_time): r.id for r in returned}
+    with phase(trace, "commit"):
+        db.commit()
+
+    with phase(trace, "build_response"):
+        location_names = {loc.id: loc.name for loc in locations}
+        schedule = ScheduleOut(
+            id=schedule_row.id,
+            week_start_date=week_start,
+            status=ScheduleStatus.draft,
+            generated_by=generated_by,
+            notes=notes,
+            created_at=schedule_row.created_at,
+            shifts=[
+                ShiftOut(
+                    id=shift_ids[(row["user_id"], row["day_of_week"], row["start_time"])],
+                    user_name=student_names[row["user_id"]],
+                    location_name=location_names[row["location_id"]],
+                    **row,
                 )
-            break
+                for row in shift_rows
+            ],
+        )
+    generation_cache.put(fingerprint, (schedule.id, result.warnings, result.report))
+    return schedule, result.warnings, result.report
 
-    return shifts_created
 
-
-def _find_best_block(
-    available_hours: set[int],
-    state: dict,
-    hour_start: int,
-    hour_end: int,
-) -> tuple[int, int] | None:
-    """Find the best contiguous block of 2-5 hours from available hours."""
-    sorted_hours = sorted(available_hours)
-    if not sorted_hours:
+def _fingerprint(
+    week_start: date,
+    generated_by: int,
+    notes: str | None,
+    location_rows: list,
+    students: list[StudentInput],
+    open_days: list[str],
+    options: tuple,
+) -> str:
+    """Stable hash of everything generate_schedule's output depends on."""
+    parts = [
+        week_start.isoformat(),
+        repr(generated_by),
+        repr(notes),
+        repr([tuple(row) for row in location_rows]),
+        repr(sorted((s.id, s.max_hours, sorted(s.masks.items())) for s in students)),
+        repr(open_days),
+        repr(options),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def _cached_draft(
+    db: Session, fingerprint: str
+) -> tuple[ScheduleOut, list[ScheduleWarning], SolverReport] | None:
+    """The cached draft for a fingerprint, if it still exists and is still a draft."""
+    entry = generation_cache.get(fingerprint)
+    if entry is None:
+        return None
+    schedule_id, warnings, report = entry
+    schedule = (
+        db.query(Schedule)
+        .options(
+            selectinload(Schedule.shifts).joinedload(Shift.user),
+            selectinload(Schedule.shifts).joinedload(Shift.location),
+        )
+        .filter(Schedule.id == schedule_id, Schedule.status == ScheduleStatus.draft)
+        .first()
+    )
+    if schedule is None:
+        generation_cache.discard(fingerprint)
         return None
+    out = ScheduleOut.model_validate(schedule)
+    for shift_out, shift in zip(out.shifts, schedule.shifts):
+        shift_out.user_name = f"{shift.user.first_name} {shift.user.last_name}"
+        shift_out.location_name = shift.location.name
+    return out, list(warnings), report.model_copy(update={"from_cache": True})
 
-    # Find all contiguous runs
-    runs: list[tuple[int, int]] = []
-    run_start = sorted_hours[0]
-    prev = sorted_hours[0]
-    for h in sorted_hours[1:]:
-        if h == prev + 1:
-            prev = h
-        else:
-            runs.append((run_start, prev + 1))
-            run_start = h
-            prev = h
-    runs.append((run_start, prev + 1))
-
-    # Pick best block: prefer 3-4 hour blocks, accept 2-5
-    best = None
-    best_len = 0
-    for start, end in runs:
-        length = end - start
-        if length < 2:
-            # Accept 1-hour blocks only if nothing better
-            if not best:
-                best = (start, end)
-                best_len = length
-            continue
-        # Clamp to max 5 hours
-        if length > 5:
-            length = 5
-            end = start + 5
-        # Prefer 3-4 hour blocks
-        if 3 <= length <= 4:
-            if not best or best_len < 3:
-                best = (start, end)
-                best_len = length
-        elif length >= best_len:
-            best = (start, end)
-            best_len = length
-
-    return best
-
-
-def _score_assignment(
-    state: dict,
-    block_hours: int,
-    day: str,
-    location_id: int,
-) -> float:
-    """Score a potential assignment. Higher = better candidate."""
-    score = 0.0
-
-    # Fairness: prefer students with lower assigned/max ratio
-    max_h = state["max_hours"] or 20
-    ratio = state["assigned_hours"] / max_h
-    score -= ratio * 100  # Heavy weight on fairness
-
-    # Day spreading: penalize students who already have many hours on this day
-    hours_on_day = state["days_assigned"].get(day, 0)
-    score -= hours_on_day * 10
-
-    # Prefer longer blocks (3-4 hours ideal)
-    if 3 <= block_hours <= 4:
-        score += 15
-    elif block_hours >= 2:
-        score += 5
-
-    # Location continuity: bonus if same location as previous shift on this day
-    last_loc = state["last_location_by_day"].get(day)
-    if last_loc == location_id:
-        score += 8
-
-    return score
+
+def start_generation_job(
+    week_start: date,
+    generated_by: int,
+    notes: str | None = None,
+    **options: Any,
+) -> Job:
+    """Queue generate_schedule on the schedule job pool; raises JobLimitReached when full."""
+
+    def work(job: Job) -> dict[str, Any]:
+        def on_loaded(days: int, locations: int) -> None:
+            job.progress = {
+                "days_done": 0,
+                "days_total": days,
+                "locations_done": 0,
+                "locations_total": days * locations,
+            }
+            job.check_cancelled()
+
+        def progress(location_days_done: int, warnings: list[ScheduleWarning]) -> None:
+            per_day = job.progress["locations_total"] // max(job.progress["days_total"], 1)
+            job.progress["locations_done"] = location_days_done
+            job.progress["days_done"] = location_days_done // per_day if per_day else 0
+            job.warnings = list(warnings)
+            job.check_cancelled()
+
+        db = SessionLocal()
+        try:
+            schedule, warnings, report = generate_schedule(
+                db, week_start, generated_by, notes,
+                on_loaded=on_loaded, progress=progress, cancelled=lambda: job.cancelled, **options,
+            )
+        finally:
+            db.close()
+        job.warnings = warnings
+        return {"schedule_id": schedule.id, "solver": report}
+
+    return schedule_jobs.submit("generate_schedule", work)
 
 
 def _build_availability_map(
     db: Session, user_ids: list[int]
-) -> dict[int, dict[str, set[int]]]:
-    """Build a map: user_id -> day -> set of available hour integers."""
-    avail_map: dict[int, dict[str, set[int]]] = defaultdict(lambda: defaultdict(set))
-    rows = db.query(Availability).filter(Availability.user_id.in_(user_ids)).all()
+) -> dict[int, dict[str, int]]:
+    """Build a map: user_id -> day -> bitmask of available hours within operating hours."""
+    avail_map: dict[int, dict[str, int]] = defaultdict(dict)
+    rows = db.query(
+        Availability.user_id, Availability.day_of_week, Availability.start_time, Availability.end_time
+    ).filter(Availability.user_id.in_(user_ids))
     for row in rows:
-        start_h = row.start_time.hour
-        end_h = row.end_time.hour
-        for h in range(start_h, end_h):
-            avail_map[row.user_id][row.day_of_week].add(h)
+        start_h = max(row.start_time.hour, HOUR_START)
+        end_h = min(row.end_time.hour, HOUR_END)
+        if start_h < end_h:
+            by_day = avail_map[row.user_id]
+            by_day[row.day_of_week] = by_day.get(row.day_of_week, 0) | hours_mask(start_h, end_h)
     return avail_map
 
 
 def _get_holidays_for_week(db: Session, week_start: date) -> set[date]:
     """Return set of dates in the week that are holidays."""
     week_end = week_start + timedelta(days=4)
-    holidays = db.query(Holiday).filter(
+    holidays = db.query(Holiday.start_date, Holiday.end_date).filter(
         Holiday.start_date <= week_end, Holiday.end_date >= week_start
-    ).all()
+    )
     result: set[date] = set()
     for h in holidays:
         d = max(h.start_date, week_start)
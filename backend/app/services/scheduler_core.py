@@ -0,0 +1,1055 @@
+"""
+Database-free scheduling core.
+
+Takes compact inputs (slotted student and location records with per-day
+availability bitmasks, plus the open days of the week) and returns plain
+Assignment tuples, so it can be benchmarked or run in another process
+without a database session. app.services.scheduler loads the inputs from
+the database and persists the result.
+
+Improvements over the app.py prototype:
+1. Variable shift blocks (2-5 hour contiguous blocks instead of 1-hour slots)
+2. Scoring function: fairness ratio, day spreading, shift length, location continuity
+3. Priority-based location filling (highest priority first)
+4. Holiday aware
+5. Warnings for understaffed slots
+
+An optional "optimal" solver re-solves the same week as a mixed-integer
+program (scipy's HiGHS backend) within a time budget and keeps the greedy
+result when it cannot beat it.
+"""
+
+import heapq
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from time import monotonic
+from typing import Callable, NamedTuple
+
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, milp
+from scipy.sparse import coo_array
+
+from app.schemas.schedule import ImprovementReport, ScheduleWarning, SolverReport
+from app.services.diagnostics import GenerationTrace, phase
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+HOUR_START = 8
+HOUR_END = 18  # 6 PM
+
+# Availability is stored as one bitmask per student per day: bit ``h`` set means
+# the student is free from h:00 to h+1:00. Only hours inside the operating window
+# are kept, so every mask shifted down by HOUR_START fits in WINDOW_BITS bits.
+WINDOW_BITS = HOUR_END - HOUR_START
+
+CONTINUITY_BONUS = 8
+
+# Objective weights shared by the optimal solver and the reported objective value:
+# every unfilled minimum-staff slot costs UNFILLED_PENALTY, the spread between the
+# most and least loaded student's assigned/max ratio costs FAIRNESS_WEIGHT per unit,
+# and each shift earns its block-length bonus (see _block_bonus).
+UNFILLED_PENALTY = 1000.0
+FAIRNESS_WEIGHT = 100.0
+
+# Above this many candidate (student, day, block, location) variables the
+# model is not built at all and the greedy result is returned.
+MAX_OPTIMAL_VARIABLES = 250_000
+
+
+class Assignment(NamedTuple):
+    """One generated shift before it is persisted."""
+
+    user_id: int
+    location_id: int
+    day: str
+    start_hour: int
+    end_hour: int
+
+
+class StudentInput:
+    """A schedulable student: weekly hour cap and availability bitmask per day."""
+
+    __slots__ = ("id", "max_hours", "masks")
+
+    def __init__(self, id: int, max_hours: float, masks: dict[str, int]):
+        self.id = id
+        self.max_hours = max_hours
+        self.masks = masks
+
+
+class LocationInput:
+    """An active location with its staffing bounds, in fill-priority order."""
+
+    __slots__ = ("id", "name", "min_staff", "max_staff")
+
+    def __init__(self, id: int, name: str, min_staff: int, max_staff: int):
+        self.id = id
+        self.name = name
+        self.min_staff = min_staff
+        self.max_staff = max_staff
+
+
+# Called with the number of location-days filled so far and the warnings found so
+# far; raising from it aborts solve_week (used for cancellation).
+ProgressCallback = Callable[[int, list[ScheduleWarning]], None]
+# Polled inside the optional phases, which cannot be interrupted by raising
+# without losing their best result so far; True makes them stop early.
+CancelledCheck = Callable[[], bool]
+
+
+class WeekResult(NamedTuple):
+    assignments: list[Assignment]
+    warnings: list[ScheduleWarning]
+    report: SolverReport
+
+
+def solve_week(
+    students: list[StudentInput],
+    locations: list[LocationInput],
+    open_days: list[str],
+    engine: str = "heap",
+    solver: str = "greedy",
+    time_limit_ms: int = 5000,
+    improve_budget_ms: int = 0,
+    progress: ProgressCallback | None = None,
+    cancelled: CancelledCheck | None = None,
+    trace: GenerationTrace | None = None,
+) -> WeekResult:
+    """Schedule one week.
+
+    ``locations`` must be in fill-priority order and ``open_days`` lists the
+    weekdays that are not holidays. ``engine`` selects how greedy candidates
+    are scored: ``"heap"`` keeps per-student dicts with a heap index,
+    ``"vectorized"`` keeps NumPy arrays and scores all students per slot at
+    once. Both produce the same shifts.
+
+    ``solver="optimal"`` additionally solves the week as a MILP within
+    ``time_limit_ms`` and keeps whichever of the two results has the lower
+    objective, so it never does worse than the greedy.
+
+    ``improve_budget_ms > 0`` runs a local-search pass over the result for at
+    most that long; its effect is reported in ``SolverReport.improvement``.
+
+    ``progress`` is called after every greedy location-day and again before
+    each optional phase. ``cancelled`` is polled during the optional phases,
+    which return their best result so far once it is true; the caller should
+    check it again before using the result. ``trace`` receives the time of each phase and the
+    greedy's candidate evaluation and block search counts.
+    """
+    weekly_masks = {s.id: s.masks for s in students}
+
+    # The greedy is always run: it is the result for solver="greedy" and the
+    # fallback for solver="optimal". It consumes its availability map, so give it a copy.
+    avail_map = {s.id: dict(s.masks) for s in students}
+    with phase(trace, "solve.greedy"):
+        assignments, warnings = _run_greedy(students, locations, open_days, avail_map, engine, progress, trace)
+    objective = _objective(assignments, students, locations, open_days, weekly_masks)
+    report = SolverReport(solver="greedy", status="heuristic", objective_value=objective)
+    done = len(open_days) * len(locations)
+
+    if solver == "optimal":
+        if progress:
+            progress(done, warnings)
+        with phase(trace, "solve.optimal"):
+            assignments, warnings, report = _improve_with_optimal(
+                students, locations, open_days, weekly_masks,
+                assignments, warnings, objective, time_limit_ms, cancelled,
+            )
+
+    if improve_budget_ms > 0:
+        if progress:
+            progress(done, warnings)
+        with phase(trace, "solve.improve"):
+            assignments, report.improvement = _improve_locally(
+                students, locations, open_days, weekly_masks, assignments, improve_budget_ms, cancelled
+            )
+        report.objective_value = report.improvement.objective_after
+        warnings = _staffing_warnings(assignments, locations, open_days)
+
+    return WeekResult(assignments, warnings, report)
+
+
+def _run_greedy(
+    students: list[StudentInput],
+    locations: list[LocationInput],
+    open_days: list[str],
+    avail_map: dict[int, dict[str, int]],
+    engine: str,
+    progress: ProgressCallback | None = None,
+    trace: GenerationTrace | None = None,
+) -> tuple[list[Assignment], list[ScheduleWarning]]:
+    """Fill every open location-day in priority order with the scored greedy."""
+    # Track per-student state
+    state = ENGINES[engine](students, avail_map)
+
+    warnings: list[ScheduleWarning] = []
+    assignments: list[Assignment] = []
+    location_days_done = 0
+
+    for day in open_days:
+        state.start_day(day)
+        for location in locations:
+            # Try to assign contiguous blocks for this location/day
+            assigned_for_slot = _assign_location_day(
+                location=location,
+                day=day,
+                state=state,
+                warnings=warnings,
+            )
+            assignments.extend(assigned_for_slot)
+            location_days_done += 1
+            if progress:
+                progress(location_days_done, warnings)
+
+    if trace:
+        evaluations, searches = state.counts()
+        trace.add("candidate_evaluations", evaluations)
+        trace.add("block_searches", searches)
+    return assignments, warnings
+
+
+def _assign_location_day(
+    location: LocationInput,
+    day: str,
+    state: "_HeapEngine | _VectorEngine",
+    warnings: list[ScheduleWarning],
+) -> list[Assignment]:
+    """Assign shifts for a single location on a single day."""
+    shifts_created = []
+    slots_needed = location.min_staff
+
+    # For each staff slot we need to fill at this location
+    for _slot_idx in range(location.max_staff):
+        best = state.best(location.id)
+        if best:
+            best_student, best_block = best
+            shifts_created.append(
+                Assignment(best_student, location.id, day, best_block[0], best_block[1])
+            )
+            state.assign(best_student, best_block, location.id)
+        else:
+            if _slot_idx < slots_needed:
+                warnings.append(_understaffed_warning(location, day, _slot_idx))
+            break
+
+    return shifts_created
+
+
+def _staffing_warnings(
+    assignments: list[Assignment], locations: list[LocationInput], open_days: list[str]
+) -> list[ScheduleWarning]:
+    """Understaffing warnings for a finished schedule, in greedy fill order."""
+    staffed: dict[tuple[int, str], int] = defaultdict(int)
+    for a in assignments:
+        staffed[(a.location_id, a.day)] += 1
+    return [
+        _understaffed_warning(loc, day, staffed[(loc.id, day)])
+        for day in open_days for loc in locations
+        if staffed[(loc.id, day)] < loc.min_staff
+    ]
+
+
+def _in_schedule_order(assignments: list[Assignment], locations: list[LocationInput]) -> list[Assignment]:
+    """Sort assignments by day, location priority and start hour."""
+    location_order = {loc.id: i for i, loc in enumerate(locations)}
+    return sorted(
+        assignments,
+        key=lambda a: (DAYS.index(a.day), location_order[a.location_id], a.start_hour),
+    )
+
+
+def _understaffed_warning(location: LocationInput, day: str, filled: int) -> ScheduleWarning:
+    return ScheduleWarning(
+        day=day,
+        time_slot=f"{HOUR_START}:00-{HOUR_END}:00",
+        location=location.name,
+        message=f"Could not fill minimum staffing (need {location.min_staff}, filled {filled})",
+    )
+
+
+class _HeapEngine:
+    """Per-student dict state with a heap candidate index rebuilt each day."""
+
+    def __init__(self, students: list[StudentInput], avail_map: dict[int, dict[str, int]]):
+        self.avail_map = avail_map
+        self.student_state: dict[int, dict] = {}
+        for s in students:
+            self.student_state[s.id] = {
+                "user": s,
+                "max_hours": s.max_hours,
+                "assigned_hours": 0.0,
+                "days_assigned": defaultdict(float),  # day -> hours on that day
+                "last_location_by_day": {},  # day -> last location_id
+            }
+        self._day = ""
+        self._candidates: _DayCandidates | None = None
+        self._evaluations = 0
+        self._searches = 0
+
+    def start_day(self, day: str) -> None:
+        self._count_day()
+        self._day = day
+        self._candidates = _DayCandidates(day, self.avail_map, self.student_state)
+
+    def counts(self) -> tuple[int, int]:
+        """(candidate evaluations, block searches) so far."""
+        self._count_day()
+        return self._evaluations, self._searches
+
+    def _count_day(self) -> None:
+        if self._candidates is not None:
+            self._evaluations += self._candidates.evaluations
+            self._searches += self._candidates.block_searches
+            self._candidates.evaluations = self._candidates.block_searches = 0
+
+    def best(self, location_id: int) -> tuple[int, tuple[int, int]] | None:
+        return self._candidates.best(location_id)
+
+    def assign(self, uid: int, block: tuple[int, int], location_id: int) -> None:
+        day = self._day
+        block_len = block[1] - block[0]
+        st = self.student_state[uid]
+        st["assigned_hours"] += block_len
+        st["days_assigned"][day] += block_len
+        st["last_location_by_day"][day] = location_id
+
+        # Clear assigned hours from availability so they aren't double-booked
+        self.avail_map[uid][day] &= ~hours_mask(block[0], block[1])
+        self._candidates.refresh(uid)
+
+
+class _VectorEngine:
+    """NumPy array state; every student is scored for a slot in one expression.
+
+    Mirrors _candidate_block and _score_assignment term by term (same float
+    operations in the same order, argmax keeps the first maximum), so it
+    selects exactly the same students and blocks as _HeapEngine.
+    """
+
+    def __init__(self, students: list[StudentInput], avail_map: dict[int, dict[str, int]]):
+        n = len(students)
+        self.user_ids = np.array([s.id for s in students], dtype=np.int64)
+        self._index = {s.id: i for i, s in enumerate(students)}
+        self.max_hours = np.array([s.max_hours for s in students], dtype=np.float64)
+        self.fair_max = np.where(self.max_hours != 0, self.max_hours, 20.0)
+        self.assigned = np.zeros(n, dtype=np.float64)
+        self.hours_by_day = np.zeros((n, len(DAYS)), dtype=np.float64)
+        self.last_location = np.full((n, len(DAYS)), -1, dtype=np.int64)
+        # Window masks (mask >> HOUR_START) so they index the block tables directly
+        self.windows = np.zeros((n, len(DAYS)), dtype=np.int64)
+        for i, s in enumerate(students):
+            by_day = avail_map.get(s.id, {})
+            for d, day in enumerate(DAYS):
+                self.windows[i, d] = by_day.get(day, 0) >> HOUR_START
+        self._d = 0
+        self._slots_scored = 0
+
+    def start_day(self, day: str) -> None:
+        self._d = DAYS.index(day)
+
+    def counts(self) -> tuple[int, int]:
+        """(candidate evaluations, block searches) so far; every student gets both per slot."""
+        n = self._slots_scored * len(self.user_ids)
+        return n, n
+
+    def best(self, location_id: int) -> tuple[int, tuple[int, int]] | None:
+        self._slots_scored += 1
+        d = self._d
+        window = self.windows[:, d]
+        start = _BLOCK_START[window]
+        end = _BLOCK_END[window]
+
+        # Trim blocks to remaining hours
+        remaining = self.max_hours - self.assigned
+        trim = (end - start) > remaining
+        end = np.where(trim, start + np.trunc(remaining).astype(np.int64), end)
+        length = end - start
+        usable = (start >= 0) & (length >= 1)
+        if not usable.any():
+            return None
+
+        score = 0.0 - (self.assigned / self.fair_max) * 100
+        score = score - self.hours_by_day[:, d] * 10
+        score = score + np.where((length >= 3) & (length <= 4), 15.0, np.where(length >= 2, 5.0, 0.0))
+        score = score + np.where(self.last_location[:, d] == location_id, float(CONTINUITY_BONUS), 0.0)
+        score = np.where(usable, score, -np.inf)
+
+        i = int(np.argmax(score))
+        return int(self.user_ids[i]), (int(start[i]), int(end[i]))
+
+    def assign(self, uid: int, block: tuple[int, int], location_id: int) -> None:
+        i = self._index[uid]
+        d = self._d
+        block_len = block[1] - block[0]
+        self.assigned[i] += block_len
+        self.hours_by_day[i, d] += block_len
+        self.last_location[i, d] = location_id
+        self.windows[i, d] &= ~(hours_mask(block[0], block[1]) >> HOUR_START)
+
+
+class _DayCandidates:
+    """Heap-indexed candidate pool for one day.
+
+    Only a student's own assignment changes their score, so every student is
+    scored once per day and re-scored after each of their assignments instead
+    of rescanning the whole department for every staff slot. Students with no
+    usable block (no availability left, or no hours left) are never indexed.
+
+    Entries are ``(-score, order, version, uid, block)``: ``order`` keeps the
+    original tie-break (first student in ``student_state`` wins) and
+    ``version`` lazily invalidates entries made stale by a refresh. The base
+    heap holds scores without the location continuity bonus; each location has
+    its own heap of the students whose last shift today was there, scored with
+    the bonus, so the best candidate for a location is the better of two tops.
+    """
+
+    def __init__(
+        self,
+        day: str,
+        avail_map: dict[int, dict[str, int]],
+        student_state: dict[int, dict],
+    ):
+        self.day = day
+        self._avail_map = avail_map
+        self._student_state = student_state
+        self._order = {uid: i for i, uid in enumerate(student_state)}
+        self._version = dict.fromkeys(student_state, 0)
+        self._base: list[tuple] = []
+        self._by_location: dict[int, list[tuple]] = defaultdict(list)
+        self.evaluations = 0
+        self.block_searches = 0
+        for uid in student_state:
+            self._push(uid)
+        heapq.heapify(self._base)
+        for heap in self._by_location.values():
+            heapq.heapify(heap)
+
+    def best(self, location_id: int) -> tuple[int, tuple[int, int]] | None:
+        """Return (user_id, block) of the best candidate for a location, if any."""
+        base = self._top(self._base)
+        local = self._top(self._by_location.get(location_id))
+        if local is not None and (base is None or local < base):
+            base = local
+        if base is None:
+            return None
+        return base[3], base[4]
+
+    def refresh(self, uid: int) -> None:
+        """Re-index a student after their state or availability changed."""
+        self._version[uid] += 1
+        self._push(uid, heap_push=heapq.heappush)
+
+    def _push(self, uid: int, heap_push=list.append) -> None:
+        state = self._student_state[uid]
+        self.block_searches += 1
+        block = _candidate_block(self._avail_map.get(uid, {}).get(self.day, 0), state)
+        if not block:
+            return
+        self.evaluations += 1
+        score = _base_score(state, block[1] - block[0], self.day)
+        entry = (-score, self._order[uid], self._version[uid], uid, block)
+        heap_push(self._base, entry)
+        last_loc = state["last_location_by_day"].get(self.day)
+        if last_loc is not None:
+            bonus_entry = (-(score + CONTINUITY_BONUS),) + entry[1:]
+            heap_push(self._by_location[last_loc], bonus_entry)
+
+    def _top(self, heap: list[tuple] | None) -> tuple | None:
+        while heap:
+            entry = heap[0]
+            if entry[2] == self._version[entry[3]]:
+                return entry
+            heapq.heappop(heap)
+        return None
+
+
+def _candidate_block(available_mask: int, state: dict) -> tuple[int, int] | None:
+    """Best block for a student, trimmed to their remaining weekly hours."""
+    if not available_mask:
+        return None
+
+    # Find the best contiguous block (2-5 hours)
+    block = _find_best_block(available_mask)
+    if not block:
+        return None
+
+    block_len = block[1] - block[0]
+    remaining = state["max_hours"] - state["assigned_hours"]
+    if block_len > remaining:
+        # Trim block to fit remaining hours
+        block = (block[0], block[0] + int(remaining))
+        block_len = block[1] - block[0]
+    if block_len < 1:
+        return None
+    return block
+
+
+def hours_mask(start: int, end: int) -> int:
+    """Bitmask with the bits for hours ``start`` (inclusive) to ``end`` (exclusive) set."""
+    return ((1 << (end - start)) - 1) << start
+
+
+def runs_in_mask(mask: int) -> list[tuple[int, int]]:
+    """Split a bitmask into its contiguous runs as (start_hour, end_hour) pairs."""
+    runs: list[tuple[int, int]] = []
+    while mask:
+        start = (mask & -mask).bit_length() - 1
+        shifted = mask >> start
+        length = (~shifted & (shifted + 1)).bit_length() - 1
+        runs.append((start, start + length))
+        mask &= ~hours_mask(start, start + length)
+    return runs
+
+
+def _pick_block(mask: int) -> tuple[int, int] | None:
+    """Pick the best contiguous block of 2-5 hours from an availability mask."""
+    # Pick best block: prefer 3-4 hour blocks, accept 2-5
+    best = None
+    best_len = 0
+    for start, end in runs_in_mask(mask):
+        length = end - start
+        if length < 2:
+            # Accept 1-hour blocks only if nothing better
+            if not best:
+                best = (start, end)
+                best_len = length
+            continue
+        # Clamp to max 5 hours
+        if length > 5:
+            length = 5
+            end = start + 5
+        # Prefer 3-4 hour blocks
+        if 3 <= length <= 4:
+            if not best or best_len < 3:
+                best = (start, end)
+                best_len = length
+        elif length >= best_len:
+            best = (start, end)
+            best_len = length
+
+    return best
+
+
+# Best block for every possible operating-window mask, indexed by mask >> HOUR_START.
+_BEST_BLOCK: list[tuple[int, int] | None] = [
+    _pick_block(window << HOUR_START) for window in range(1 << WINDOW_BITS)
+]
+
+
+# The same table as parallel NumPy arrays of absolute hours (-1 where there is no block).
+_BLOCK_START = np.array([b[0] if b else -1 for b in _BEST_BLOCK], dtype=np.int64)
+_BLOCK_END = np.array([b[1] if b else -1 for b in _BEST_BLOCK], dtype=np.int64)
+
+
+def _find_best_block(available_mask: int) -> tuple[int, int] | None:
+    """Find the best contiguous block of 2-5 hours from an availability mask."""
+    return _BEST_BLOCK[available_mask >> HOUR_START]
+
+
+def _score_assignment(
+    state: dict,
+    block_hours: int,
+    day: str,
+    location_id: int,
+) -> float:
+    """Score a potential assignment. Higher = better candidate."""
+    score = _base_score(state, block_hours, day)
+
+    # Location continuity: bonus if same location as previous shift on this day
+    last_loc = state["last_location_by_day"].get(day)
+    if last_loc == location_id:
+        score += CONTINUITY_BONUS
+
+    return score
+
+
+def _base_score(state: dict, block_hours: int, day: str) -> float:
+    """Location-independent part of the assignment score."""
+    score = 0.0
+
+    # Fairness: prefer students with lower assigned/max ratio
+    max_h = state["max_hours"] or 20
+    ratio = state["assigned_hours"] / max_h
+    score -= ratio * 100  # Heavy weight on fairness
+
+    # Day spreading: penalize students who already have many hours on this day
+    hours_on_day = state["days_assigned"].get(day, 0)
+    score -= hours_on_day * 10
+
+    # Prefer longer blocks (3-4 hours ideal)
+    score += _block_bonus(block_hours)
+
+    return score
+
+
+def _block_bonus(block_hours: int) -> float:
+    """Bonus for the length of a block: 3-4 hours ideal, 2 or 5 acceptable."""
+    if 3 <= block_hours <= 4:
+        return 15
+    if block_hours >= 2:
+        return 5
+    return 0
+
+
+ENGINES = {"heap": _HeapEngine, "vectorized": _VectorEngine}
+
+
+def _objective(
+    assignments: list[Assignment],
+    students: list[StudentInput],
+    locations: list[LocationInput],
+    open_days: list[str],
+    weekly_masks: dict[int, dict[str, int]],
+) -> float:
+    """Objective value of a schedule under the optimal solver's weights (lower is better)."""
+    staffed: dict[tuple[int, str], int] = defaultdict(int)
+    hours: dict[int, float] = defaultdict(float)
+    bonus = 0.0
+    for a in assignments:
+        staffed[(a.location_id, a.day)] += 1
+        hours[a.user_id] += a.end_hour - a.start_hour
+        bonus += _block_bonus(a.end_hour - a.start_hour)
+
+    unfilled = sum(
+        max(loc.min_staff - staffed[(loc.id, day)], 0)
+        for loc in locations for day in open_days
+    )
+    ratios = [
+        hours[s.id] / (s.max_hours or 20)
+        for s in students
+        if s.max_hours > 0
+        and any(weekly_masks.get(s.id, {}).get(day, 0) for day in open_days)
+    ]
+    spread = max(ratios) - min(ratios) if ratios else 0.0
+    return UNFILLED_PENALTY * unfilled + FAIRNESS_WEIGHT * spread - bonus
+
+
+def _improve_with_optimal(
+    students: list[StudentInput],
+    locations: list[LocationInput],
+    open_days: list[str],
+    weekly_masks: dict[int, dict[str, int]],
+    greedy: list[Assignment],
+    greedy_warnings: list[ScheduleWarning],
+    greedy_objective: float,
+    time_limit_ms: int,
+    cancelled: CancelledCheck | None = None,
+) -> tuple[list[Assignment], list[ScheduleWarning], SolverReport]:
+    """Solve the week as a MILP and keep it only if it beats the greedy result."""
+    deadline = monotonic() + time_limit_ms / 1000
+    fallback = SolverReport(solver="optimal", status="fallback", objective_value=greedy_objective)
+
+    def stopped() -> bool:
+        return monotonic() >= deadline or (cancelled is not None and cancelled())
+
+    # HiGHS cannot be interrupted once started, so cancellation is honoured
+    # while the model is built and the solve itself is bounded by the deadline
+    model = _build_optimal_model(students, locations, open_days, weekly_masks, stopped)
+    remaining = deadline - monotonic()
+    if model is None or remaining <= 0 or stopped():
+        return greedy, greedy_warnings, fallback
+
+    candidates, c, constraints, bounds, integrality = model
+    res = milp(
+        c,
+        constraints=constraints,
+        bounds=bounds,
+        integrality=integrality,
+        options={"time_limit": remaining, "disp": False},
+    )
+    dual_bound = getattr(res, "mip_dual_bound", None)
+    if res.x is None or res.fun is None or res.fun >= greedy_objective:
+        if dual_bound is not None and np.isfinite(dual_bound) and greedy_objective:
+            fallback.optimality_gap = max(greedy_objective - dual_bound, 0.0) / abs(greedy_objective)
+        return greedy, greedy_warnings, fallback
+
+    chosen = _in_schedule_order(
+        [candidates[k] for k in np.flatnonzero(res.x[: len(candidates)] > 0.5)], locations
+    )
+    warnings = _staffing_warnings(chosen, locations, open_days)
+    report = SolverReport(
+        solver="optimal",
+        status="optimal" if res.status == 0 else "time_limit",
+        objective_value=float(res.fun),
+        optimality_gap=float(getattr(res, "mip_gap", 0.0) or 0.0),
+    )
+    return chosen, warnings, report
+
+
+def _build_optimal_model(
+    students: list[StudentInput],
+    locations: list[LocationInput],
+    open_days: list[str],
+    weekly_masks: dict[int, dict[str, int]],
+    stopped: CancelledCheck,
+):
+    """Build the MILP for one week.
+
+    Variables: one binary per (student, day, block, location) candidate, a
+    continuous shortfall per location-day below min_staff, and the max/min
+    assigned ratio over eligible students. Returns None if the model would be
+    larger than MAX_OPTIMAL_VARIABLES or ``stopped()`` turns true while building.
+    """
+    candidates: list[Assignment] = []
+    cand_student: list[int] = []
+    for i, s in enumerate(students):
+        if stopped():
+            return None
+        if s.max_hours <= 0:
+            continue
+        for day in open_days:
+            for run_start, run_end in runs_in_mask(weekly_masks.get(s.id, {}).get(day, 0)):
+                run_len = run_end - run_start
+                shortest = 1 if run_len == 1 or s.max_hours < 2 else 2
+                for length in range(shortest, min(run_len, 5) + 1):
+                    for start in range(run_start, run_end - length + 1):
+                        for loc in locations:
+                            candidates.append(Assignment(s.id, loc.id, day, start, start + length))
+                            cand_student.append(i)
+                if len(candidates) > MAX_OPTIMAL_VARIABLES:
+                    return None
+
+    n_x = len(candidates)
+    location_days = [(loc, day) for day in open_days for loc in locations]
+    n_u = len(location_days)
+    r_max, r_min = n_x + n_u, n_x + n_u + 1
+    n_vars = n_x + n_u + 2
+
+    c = np.zeros(n_vars)
+    c[:n_x] = [-_block_bonus(a.end_hour - a.start_hour) for a in candidates]
+    c[n_x:n_x + n_u] = UNFILLED_PENALTY
+    c[r_max] = FAIRNESS_WEIGHT
+    c[r_min] = -FAIRNESS_WEIGHT
+
+    rows: list[int] = []
+    cols: list[int] = []
+    vals: list[float] = []
+    lb: list[float] = []
+    ub: list[float] = []
+
+    def add_row(entries: list[tuple[int, float]], low: float, high: float) -> None:
+        row = len(lb)
+        for col, val in entries:
+            rows.append(row)
+            cols.append(col)
+            vals.append(val)
+        lb.append(low)
+        ub.append(high)
+
+    # Staffing: at most max_staff shifts, at least min_staff minus the shortfall
+    by_location_day: dict[tuple[int, str], list[int]] = defaultdict(list)
+    by_student_hour: dict[tuple[int, str, int], list[int]] = defaultdict(list)
+    by_student: dict[int, list[int]] = defaultdict(list)
+    if stopped():
+        return None
+    for k, a in enumerate(candidates):
+        by_location_day[(a.location_id, a.day)].append(k)
+        for h in range(a.start_hour, a.end_hour):
+            by_student_hour[(a.user_id, a.day, h)].append(k)
+        by_student[cand_student[k]].append(k)
+    for u, (loc, day) in enumerate(location_days):
+        ks = by_location_day[(loc.id, day)]
+        add_row([(k, 1.0) for k in ks], -np.inf, loc.max_staff)
+        add_row([(k, 1.0) for k in ks] + [(n_x + u, 1.0)], loc.min_staff, np.inf)
+
+    # A student works at most one location in any hour
+    for ks in by_student_hour.values():
+        if len(ks) > 1:
+            if stopped():
+                return None
+            add_row([(k, 1.0) for k in ks], -np.inf, 1.0)
+
+    # Weekly hour caps and the fairness spread
+    for i, ks in by_student.items():
+        if stopped():
+            return None
+        s = students[i]
+        lengths = [(k, float(candidates[k].end_hour - candidates[k].start_hour)) for k in ks]
+        add_row(lengths, -np.inf, s.max_hours)
+        fair_max = s.max_hours or 20
+        add_row([(k, v / fair_max) for k, v in lengths] + [(r_max, -1.0)], -np.inf, 0.0)
+        add_row([(k, v / fair_max) for k, v in lengths] + [(r_min, -1.0)], 0.0, np.inf)
+
+    if not lb or stopped():
+        return None
+    matrix = coo_array((vals, (rows, cols)), shape=(len(lb), n_vars)).tocsr()
+    upper = np.ones(n_vars)
+    upper[n_x:n_x + n_u] = [loc.min_staff for loc, _ in location_days]
+    integrality = np.zeros(n_vars)
+    integrality[:n_x] = 1
+    return (
+        candidates,
+        c,
+        LinearConstraint(matrix, np.array(lb), np.array(ub)),
+        Bounds(np.zeros(n_vars), upper),
+        integrality,
+    )
+
+
+def _improve_locally(
+    students: list[StudentInput],
+    locations: list[LocationInput],
+    open_days: list[str],
+    weekly_masks: dict[int, dict[str, int]],
+    assignments: list[Assignment],
+    budget_ms: int,
+    cancelled: CancelledCheck | None = None,
+) -> tuple[list[Assignment], ImprovementReport]:
+    """Apply improving local-search moves until none is left, the budget runs out or ``cancelled()``."""
+    started = monotonic()
+    deadline = started + budget_ms / 1000
+
+    def stopped() -> bool:
+        return monotonic() >= deadline or (cancelled is not None and cancelled())
+
+    search = _LocalSearch(students, locations, open_days, weekly_masks, assignments)
+    unfilled_before, spread_before, objective_before = search.metrics()
+
+    moves = 0
+    while not stopped() and search.step(stopped):
+        moves += 1
+
+    unfilled_after, spread_after, objective_after = search.metrics()
+    report = ImprovementReport(
+        budget_ms=budget_ms,
+        elapsed_ms=round((monotonic() - started) * 1000, 3),
+        moves_applied=moves,
+        unfilled_min_slots_before=unfilled_before,
+        unfilled_min_slots_after=unfilled_after,
+        fairness_spread_before=spread_before,
+        fairness_spread_after=spread_after,
+        objective_before=objective_before,
+        objective_after=objective_after,
+    )
+    return _in_schedule_order(search.assignments(), locations), report
+
+
+class _LocalSearch:
+    """Incremental state for the improvement pass.
+
+    A move removes some shifts and adds others. Its objective delta (same
+    weights as _objective) is computed from the staffing counts of the touched
+    location-days, the hours of the touched students, their block bonuses and
+    the multiset of assigned/max ratios, so evaluating a move never rescans the
+    schedule. Moves: fill an understaffed location-day (new shift or relocating
+    one from a location above its minimum), reassign a shift to another
+    student, swap two students' shifts, and extend a shift by one hour.
+    """
+
+    def __init__(
+        self,
+        students: list[StudentInput],
+        locations: list[LocationInput],
+        open_days: list[str],
+        weekly_masks: dict[int, dict[str, int]],
+        assignments: list[Assignment],
+    ):
+        self.locations = {loc.id: loc for loc in locations}
+        self.open_days = open_days
+        self.masks = weekly_masks
+        self.max_hours = {s.id: s.max_hours for s in students}
+        self.fair_max = {s.id: s.max_hours or 20 for s in students}
+        self.eligible = [
+            s.id for s in students
+            if s.max_hours > 0
+            and any(weekly_masks.get(s.id, {}).get(day, 0) for day in open_days)
+        ]
+
+        self.shifts: dict[int, Assignment] = {}
+        self.by_user: dict[int, set[int]] = defaultdict(set)
+        self.used: dict[tuple[int, str], int] = defaultdict(int)
+        self.hours: dict[int, float] = defaultdict(float)
+        self.staffed: dict[tuple[int, str], int] = defaultdict(int)
+        self.bonus = 0.0
+        self._next_id = 0
+        for a in assignments:
+            self._add(a)
+        # Multiset of assigned/max ratios, plus its distinct values in order
+        self.ratios = Counter(self._ratio(uid, self.hours[uid]) for uid in self.eligible)
+        self.distinct_ratios = sorted(self.ratios)
+
+    def assignments(self) -> list[Assignment]:
+        return list(self.shifts.values())
+
+    def metrics(self) -> tuple[int, float, float]:
+        """(unfilled minimum slots, fairness spread, objective) of the current state."""
+        unfilled = sum(self._shortfall(key, 0) for key in self._location_days())
+        spread = self._spread_with({})
+        return unfilled, spread, UNFILLED_PENALTY * unfilled + FAIRNESS_WEIGHT * spread - self.bonus
+
+    def step(self, stopped: CancelledCheck) -> bool:
+        """Apply the first improving move found; False if there is none or ``stopped()``."""
+        for remove, add in self._moves():
+            if stopped():
+                return False
+            if self._delta(remove, add) < -1e-9:
+                self._apply(remove, add)
+                return True
+        return False
+
+    # -- move generation -------------------------------------------------
+
+    def _moves(self):
+        students_by_ratio = sorted(self.eligible, key=lambda uid: self.hours[uid] / self.fair_max[uid])
+
+        # Fill understaffed location-days
+        for loc_id, day in self._location_days():
+            if self._shortfall((loc_id, day), 0) == 0:
+                continue
+            for sid, a in self.shifts.items():
+                if a.day == day and a.location_id != loc_id:
+                    donor = self.locations[a.location_id]
+                    if self.staffed[(a.location_id, day)] > donor.min_staff:
+                        yield [sid], [a._replace(location_id=loc_id)]
+            for uid in students_by_ratio:
+                block = self._free_block(uid, day)
+                if block:
+                    yield [], [Assignment(uid, loc_id, day, block[0], block[1])]
+
+        # Hand shifts from the most loaded students to less loaded ones
+        for giver in reversed(students_by_ratio):
+            for sid in list(self.by_user[giver]):
+                a = self.shifts[sid]
+                block_mask = hours_mask(a.start_hour, a.end_hour)
+                for taker in students_by_ratio:
+                    if taker == giver:
+                        break
+                    free = self._free_mask(taker, a.day)
+                    if free & block_mask == block_mask:
+                        yield [sid], [a._replace(user_id=taker)]
+                    for other_sid in self.by_user[taker]:
+                        b = self.shifts[other_sid]
+                        if b.end_hour - b.start_hour < a.end_hour - a.start_hour:
+                            yield [sid, other_sid], [
+                                a._replace(user_id=taker),
+                                b._replace(user_id=giver),
+                            ]
+
+        # Lengthen shifts of the least loaded students
+        for uid in students_by_ratio:
+            for sid in list(self.by_user[uid]):
+                a = self.shifts[sid]
+                if a.end_hour - a.start_hour >= 5:
+                    continue
+                if a.start_hour > HOUR_START:
+                    yield [sid], [a._replace(start_hour=a.start_hour - 1)]
+                if a.end_hour < HOUR_END:
+                    yield [sid], [a._replace(end_hour=a.end_hour + 1)]
+
+    def _free_mask(self, uid: int, day: str) -> int:
+        return self.masks.get(uid, {}).get(day, 0) & ~self.used[(uid, day)]
+
+    def _free_block(self, uid: int, day: str) -> tuple[int, int] | None:
+        state = {"max_hours": self.max_hours[uid], "assigned_hours": self.hours[uid]}
+        return _candidate_block(self._free_mask(uid, day), state)
+
+    # -- incremental evaluation ------------------------------------------
+
+    def _delta(self, remove: list[int], add: list[Assignment]) -> float:
+        """Objective change of a move, or +inf if the move is infeasible."""
+        removed = [self.shifts[sid] for sid in remove]
+        staffed: dict[tuple[int, str], int] = defaultdict(int)
+        hours: dict[int, float] = defaultdict(float)
+        used: dict[tuple[int, str], int] = {}
+        bonus = 0.0
+        for a in removed:
+            staffed[(a.location_id, a.day)] -= 1
+            hours[a.user_id] -= a.end_hour - a.start_hour
+            key = (a.user_id, a.day)
+            used[key] = used.get(key, self.used[key]) & ~hours_mask(a.start_hour, a.end_hour)
+            bonus -= _block_bonus(a.end_hour - a.start_hour)
+        for a in add:
+            block_mask = hours_mask(a.start_hour, a.end_hour)
+            key = (a.user_id, a.day)
+            taken = used.get(key, self.used[key])
+            if self.masks.get(a.user_id, {}).get(a.day, 0) & block_mask != block_mask or taken & block_mask:
+                return float("inf")
+            used[key] = taken | block_mask
+            staffed[(a.location_id, a.day)] += 1
+            hours[a.user_id] += a.end_hour - a.start_hour
+            bonus += _block_bonus(a.end_hour - a.start_hour)
+
+        unfilled = 0
+        for key, change in staffed.items():
+            if self.staffed[key] + change > self.locations[key[0]].max_staff:
+                return float("inf")
+            unfilled += self._shortfall(key, change) - self._shortfall(key, 0)
+        for uid, change in hours.items():
+            if self.hours[uid] + change > self.max_hours[uid]:
+                return float("inf")
+
+        ratio_changes: dict[float, int] = defaultdict(int)
+        for uid, change in hours.items():
+            if change and self.max_hours[uid] > 0:
+                ratio_changes[self._ratio(uid, self.hours[uid])] -= 1
+                ratio_changes[self._ratio(uid, self.hours[uid] + change)] += 1
+        spread = self._spread_with(ratio_changes) - self._spread_with({})
+        return UNFILLED_PENALTY * unfilled + FAIRNESS_WEIGHT * spread - bonus
+
+    def _apply(self, remove: list[int], add: list[Assignment]) -> None:
+        before = {a.user_id: self.hours[a.user_id] for a in add}
+        before.update({self.shifts[sid].user_id: self.hours[self.shifts[sid].user_id] for sid in remove})
+        for sid in remove:
+            self._remove(sid)
+        for a in add:
+            self._add(a)
+        for uid, old in before.items():
+            self._move_ratio(uid, old, self.hours[uid])
+
+    def _add(self, a: Assignment) -> None:
+        sid = self._next_id
+        self._next_id += 1
+        self.shifts[sid] = a
+        self.by_user[a.user_id].add(sid)
+        self.used[(a.user_id, a.day)] |= hours_mask(a.start_hour, a.end_hour)
+        self.hours[a.user_id] += a.end_hour - a.start_hour
+        self.staffed[(a.location_id, a.day)] += 1
+        self.bonus += _block_bonus(a.end_hour - a.start_hour)
+
+    def _remove(self, sid: int) -> None:
+        a = self.shifts.pop(sid)
+        self.by_user[a.user_id].discard(sid)
+        self.used[(a.user_id, a.day)] &= ~hours_mask(a.start_hour, a.end_hour)
+        self.hours[a.user_id] -= a.end_hour - a.start_hour
+        self.staffed[(a.location_id, a.day)] -= 1
+        self.bonus -= _block_bonus(a.end_hour - a.start_hour)
+
+    def _location_days(self):
+        return [(loc_id, day) for day in self.open_days for loc_id in self.locations]
+
+    def _shortfall(self, key: tuple[int, str], change: int) -> int:
+        return max(self.locations[key[0]].min_staff - (self.staffed[key] + change), 0)
+
+    def _ratio(self, uid: int, hours: float) -> float:
+        return hours / self.fair_max[uid]
+
+    def _move_ratio(self, uid: int, old_hours: float, new_hours: float) -> None:
+        if self.max_hours[uid] <= 0:
+            return
+        old = self._ratio(uid, old_hours)
+        self.ratios[old] -= 1
+        if not self.ratios[old]:
+            del self.ratios[old]
+            del self.distinct_ratios[bisect_left(self.distinct_ratios, old)]
+        new = self._ratio(uid, new_hours)
+        if new not in self.ratios:
+            insort(self.distinct_ratios, new)
+        self.ratios[new] += 1
+
+    def _spread_with(self, changes: dict[float, int]) -> float:
+        """Max minus min ratio after applying count ``changes`` to the multiset.
+
+        Scanning in from either end skips at most one distinct value per
+        negative change, so this is O(len(changes)) rather than a copy of the
+        multiset.
+        """
+
+        def present(r: float) -> bool:
+            return self.ratios.get(r, 0) + changes.get(r, 0) > 0
+
+        high = next((r for r in reversed(self.distinct_ratios) if present(r)), None)
+        low = next((r for r in self.distinct_ratios if present(r)), None)
+        for r, change in changes.items():
+            if change > 0 and r not in self.ratios:
+                high = r if high is None or r > high else high
+                low = r if low is None or r < low else low
+        return high - low if high is not None else 0.0
@@ -0,0 +1,117 @@
+"""
+Streaming CSV and ICS exports of shifts.
+
+Exports are generators for ``StreamingResponse``: the header goes out before
+any query runs, then shifts are read through a server-side cursor (users
+and locations joined in the same statement) and written out in bounded
+chunks, so memory stays flat however many shifts are exported.
+
+The generators open their own session because the response body is sent
+after the request's session has been handed back.
+"""
+
+import csv
+import io
+from typing import Iterable, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.sql import ColumnElement
+
+from app.database import ReadSessionLocal
+from app.models.location import Location
+from app.models.shift import Shift
+from app.models.user import User
+from app.services.ics_export import calendar_frame, new_calendar, shift_event
+
+# Rows fetched per round trip from the server-side cursor
+FETCH_SIZE = 1000
+# Bytes buffered before a chunk is sent
+CHUNK_SIZE = 64 * 1024
+
+CSV_HEADER = ["Day", "Date", "Start", "End", "Location", "Worker"]
+
+
+def shift_rows(*conditions: ColumnElement) -> Iterator:
+    """Shifts matching ``conditions`` with user and location names, in date order."""
+    stmt = (
+        select(
+            Shift.id,
+            Shift.day_of_week,
+            Shift.actual_date,
+            Shift.start_time,
+            Shift.end_time,
+            User.first_name,
+            User.last_name,
+            Location.name.label("location_name"),
+        )
+        .outerjoin(User, Shift.user_id == User.id)
+        .outerjoin(Location, Shift.location_id == Location.id)
+        .where(*conditions)
+        .order_by(Shift.actual_date, Shift.start_time, Shift.id)
+        .execution_options(yield_per=FETCH_SIZE)
+    )
+    db = ReadSessionLocal()
+    try:
+        yield from db.execute(stmt)
+    finally:
+        db.close()
+
+
+def _chunked(pieces: Iterable[bytes]) -> Iterator[bytes]:
+    buffer = bytearray()
+    for piece in pieces:
+        buffer += piece
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def _worker(row) -> str:
+    return f"{row.first_name} {row.last_name}" if row.first_name is not None else ""
+
+
+def stream_csv(*conditions: ColumnElement) -> Iterator[bytes]:
+    output = io.StringIO()
+    writer = csv.writer(output)
+
+    def encode() -> bytes:
+        data = output.getvalue().encode()
+        output.seek(0)
+        output.truncate()
+        return data
+
+    writer.writerow(CSV_HEADER)
+    yield encode()
+
+    def lines() -> Iterator[bytes]:
+        for row in shift_rows(*conditions):
+            writer.writerow([
+                row.day_of_week,
+                str(row.actual_date),
+                row.start_time.strftime("%H:%M"),
+                row.end_time.strftime("%H:%M"),
+                row.location_name or "",
+                _worker(row),
+            ])
+            yield encode()
+
+    yield from _chunked(lines())
+
+
+def stream_ics(*conditions: ColumnElement, calendar_name: str = "IT Help Desk Schedule") -> Iterator[bytes]:
+    header, footer = calendar_frame(new_calendar(calendar_name))
+    yield header
+    yield from _chunked(
+        shift_event(
+            row.id,
+            _worker(row) or "Unassigned",
+            row.location_name or "Unknown",
+            row.actual_date,
+            row.start_time,
+            row.end_time,
+        ).to_ical()
+        for row in shift_rows(*conditions)
+    )
+    yield footer
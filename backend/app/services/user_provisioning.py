@@ -0,0 +1,93 @@
+"""
+Bulk account creation from a CSV, for onboarding a whole cohort at once.
+
+Columns are ``email, first_name, last_name, password`` plus optional
+``role`` and ``max_hours_per_week``. Each row is validated like a
+registration; invalid rows, emails repeated in the file and emails that
+already have an account are reported and skipped. The remaining passwords
+are hashed in parallel on a process pool and the users are inserted with
+one statement in one transaction.
+"""
+
+import csv
+from typing import TextIO
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.auth.jwt import hash_passwords
+from app.models.user import User
+from app.schemas.user import UserBulkCreateOut, UserCreate, UserOut, UserProvisionError
+
+REQUIRED_COLUMNS = ("email", "first_name", "last_name", "password")
+OPTIONAL_COLUMNS = ("role", "max_hours_per_week")
+
+
+class InvalidProvisioningFile(ValueError):
+    """The file as a whole cannot be imported."""
+
+
+def _validation_detail(exc: ValidationError) -> str:
+    error = exc.errors()[0]
+    field = ".".join(str(part) for part in error["loc"])
+    return f"{field}: {error['msg']}" if field else error["msg"]
+
+
+def provision_users(db: Session, stream: TextIO) -> UserBulkCreateOut:
+    reader = csv.DictReader(stream)
+    missing = [c for c in REQUIRED_COLUMNS if c not in (reader.fieldnames or [])]
+    if missing:
+        raise InvalidProvisioningFile(f"The CSV header is missing: {', '.join(missing)}")
+
+    accepted: list[tuple[int, UserCreate]] = []
+    errors: list[UserProvisionError] = []
+    seen: set[str] = set()
+    rows = 0
+    for row in reader:
+        rows += 1
+        email = (row.get("email") or "").strip()
+        # Blank optional cells fall back to the UserCreate defaults
+        fields = {c: (row.get(c) or "").strip() for c in (*REQUIRED_COLUMNS, *OPTIONAL_COLUMNS)}
+        try:
+            user = UserCreate.model_validate({k: v for k, v in fields.items() if v or k in REQUIRED_COLUMNS})
+        except ValidationError as exc:
+            errors.append(UserProvisionError(line=reader.line_num, email=email, detail=_validation_detail(exc)))
+            continue
+        if user.email.lower() in seen:
+            errors.append(UserProvisionError(line=reader.line_num, email=email, detail="Duplicate email in file"))
+            continue
+        seen.add(user.email.lower())
+        accepted.append((reader.line_num, user))
+
+    if accepted:
+        existing = set(db.scalars(select(User.email).where(User.email.in_([u.email for _, u in accepted]))))
+        for line, user in accepted:
+            if user.email in existing:
+                errors.append(UserProvisionError(line=line, email=user.email, detail="Email already registered"))
+        accepted = [(line, user) for line, user in accepted if user.email not in existing]
+    errors.sort(key=lambda e: e.line)
+    if not accepted:
+        return UserBulkCreateOut(rows=rows, created=[], errors=errors)
+
+    hashes = hash_passwords([user.password for _, user in accepted])
+    values = [
+        {
+            "email": user.email,
+            "password_hash": password_hash,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "role": user.role,
+            "max_hours_per_week": user.max_hours_per_week,
+        }
+        for (_, user), password_hash in zip(accepted, hashes)
+    ]
+    try:
+        created = db.scalars(insert(User).returning(User), values).all()
+        out = [UserOut.model_validate(u) for u in created]
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    out.sort(key=lambda u: u.id)
+    return UserBulkCreateOut(rows=rows, created=out, errors=errors)
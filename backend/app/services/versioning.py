@@ -0,0 +1,63 @@
+"""
+Schedule version tokens and conditional GET helpers.
+
+Every schedule carries a ``version`` that is bumped whenever anything a
+client can see in it changes (publish, archive, shift create/update/delete,
+and renaming a user or location that its shifts show).
+Read endpoints derive a weak ETag from it with one small query and answer a
+matching ``If-None-Match`` with 304 before any shift is loaded.
+"""
+
+import hashlib
+
+from fastapi import Request, Response
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.models.schedule import Schedule
+from app.models.shift import Shift
+
+NOT_MODIFIED_STATUS = 304
+
+
+def bump_schedule_version(db: Session, *conditions) -> None:
+    """Increment ``version`` and touch ``updated_at`` of the schedules matching ``conditions``.
+
+    Runs in the caller's transaction; commit as usual.
+    """
+    db.execute(
+        update(Schedule)
+        .where(*conditions)
+        .values(version=Schedule.version + 1, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def bump_versions_with_shifts(db: Session, *shift_conditions) -> None:
+    """Bump every schedule that has a shift matching ``shift_conditions``."""
+    bump_schedule_version(db, Schedule.id.in_(select(Shift.schedule_id).where(*shift_conditions)))
+
+
+def schedule_etag(schedule_id: int, version: int, variant: str = "json") -> str:
+    return f'W/"schedule-{schedule_id}-v{version}-{variant}"'
+
+
+def digest_etag(*parts) -> str:
+    """Weak ETag from an arbitrary tuple of values (aggregates over several schedules)."""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: W/ prefixes are ignored on both sides
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=NOT_MODIFIED_STATUS, headers={"ETag": etag})
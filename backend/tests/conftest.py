@@ -0,0 +1,14 @@
+"""Test configuration, applied before any test module imports the app."""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Every test run gets a throwaway SQLite database, whatever .env points at
+_db_dir = tempfile.mkdtemp(prefix="scheduler-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.pop("DATABASE_READ_URL", None)
+# Cheap hashes; the cost factor does not change any behaviour under test
+os.environ["BCRYPT_ROUNDS"] = "4"
@@ -0,0 +1,182 @@
+"""
+Query-count regression tests for the hot endpoints.
+
+Runs the app against a throwaway SQLite database (see conftest.py) and
+counts the statements each request sends. Counts are taken with the auth
+caches warm, the steady state, except where a test says otherwise.
+"""
+
+from datetime import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.auth.cache import user_cache
+from app.auth.jwt import hash_password
+from app.database import Base, SessionLocal, engine, read_engine
+from app.main import app
+from app.models.availability import Availability
+from app.models.location import Location
+from app.models.user import User, UserRole
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    def __call__(self, _conn, _cursor, statement, *_args) -> None:
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@pytest.fixture(scope="module")
+def client():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    password_hash = hash_password("pw")
+    db.add(User(
+        email="supervisor@example.edu", password_hash=password_hash, first_name="Sam",
+        last_name="Visor", role=UserRole.supervisor,
+    ))
+    for name, min_staff, max_staff, priority in [("Bristlecone", 1, 1, 3), ("Library", 1, 2, 2), ("Main Desk", 2, 10, 1)]:
+        db.add(Location(name=name, min_staff=min_staff, max_staff=max_staff, priority=priority))
+    for i in range(12):
+        student = User(
+            email=f"student{i}@example.edu", password_hash=password_hash, first_name=f"Student{i}",
+            last_name=f"Number{i}", role=UserRole.student, max_hours_per_week=20,
+        )
+        db.add(student)
+        db.flush()
+        for day in DAYS:
+            db.add(Availability(
+                user_id=student.id, day_of_week=day, start_time=time(8 + i % 4),
+                end_time=time(13 + i % 5), is_recurring=True,
+            ))
+    db.commit()
+    db.close()
+
+    with TestClient(app) as client:
+        response = client.post("/api/auth/login", json={"email": "supervisor@example.edu", "password": "pw"})
+        assert response.status_code == 200
+        # Warm the token and user caches
+        assert client.get("/api/auth/me").status_code == 200
+        yield client
+
+
+@pytest.fixture
+def queries():
+    counter = QueryCounter()
+    engines = {engine, read_engine}
+    for e in engines:
+        event.listen(e, "before_cursor_execute", counter)
+    yield counter
+    for e in engines:
+        event.remove(e, "before_cursor_execute", counter)
+
+
+def _generate(client: TestClient, week_start: str) -> dict:
+    response = client.post("/api/schedules/generate", json={"week_start_date": week_start})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_generate(client, queries):
+    _generate(client, "2025-01-06")
+    # locations, students, holidays, availability, schedule insert, shift insert
+    assert queries.count == 6, queries.statements
+
+
+def test_generate_with_cold_user_cache(client, queries):
+    user_cache.clear()
+    _generate(client, "2025-01-13")
+    # The user snapshot lookup on top of the six above
+    assert queries.count == 7, queries.statements
+
+
+def test_current_schedule(client, queries):
+    schedule = _generate(client, "2025-01-20")["schedule"]
+    assert client.patch(f"/api/schedules/{schedule['id']}/publish").status_code == 200
+    first = client.get("/api/schedules/current")
+    assert first.status_code == 200
+
+    queries.statements.clear()
+    warm = client.get("/api/schedules/current")
+    assert warm.status_code == 200
+    assert warm.content == first.content
+    # Only the (id, version) lookup; the body comes from the published schedule cache
+    assert queries.count == 1, queries.statements
+
+    queries.statements.clear()
+    cached = client.get("/api/schedules/current", headers={"If-None-Match": warm.headers["etag"]})
+    assert cached.status_code == 304
+    assert queries.count == 1, queries.statements
+
+
+def test_list_schedules(client, queries):
+    _generate(client, "2025-01-27")
+    queries.statements.clear()
+    response = client.get("/api/schedules/")
+    assert response.status_code == 200
+    assert len(response.json()) >= 2
+    # One summary query, shift totals included
+    assert queries.count == 1, queries.statements
+
+
+def test_list_schedules_with_shifts(client, queries):
+    response = client.get("/api/schedules/", params={"include_shifts": True})
+    assert response.status_code == 200
+    assert all(s["shifts"] for s in response.json())
+    # Schedules, then all of their shifts with users and locations
+    assert queries.count == 2, queries.statements
+
+
+
+def test_get_schedule(client, queries):
+    schedule = _generate(client, "2025-02-03")["schedule"]
+    queries.statements.clear()
+    response = client.get(f"/api/schedules/{schedule['id']}")
+    assert response.status_code == 200
+    assert len(response.json()["shifts"]) == len(schedule["shifts"])
+    # The schedule, then its shifts with users and locations
+    assert queries.count == 2, queries.statements
+
+
+def test_publish(client, queries):
+    schedule = _generate(client, "2025-02-10")["schedule"]
+    queries.statements.clear()
+    assert client.patch(f"/api/schedules/{schedule['id']}/publish").status_code == 200
+    # Lookup; version bump and archive of the previously published schedule;
+    # status update and version bump; the reloaded schedule and its shifts
+    assert queries.count == 7, queries.statements
+
+
+def test_archive(client, queries):
+    schedule = _generate(client, "2025-02-17")["schedule"]
+    queries.statements.clear()
+    assert client.patch(f"/api/schedules/{schedule['id']}/archive").status_code == 200
+    # Lookup; status update and version bump; the reloaded schedule and its shifts
+    assert queries.count == 5, queries.statements
+
+
+def test_my_shifts(client, queries):
+    user_id = _generate(client, "2025-02-24")["schedule"]["shifts"][0]["user_id"]
+    db = SessionLocal()
+    email = db.get(User, user_id).email
+    db.close()
+    with TestClient(app) as student:
+        assert student.post("/api/auth/login", json={"email": email, "password": "pw"}).status_code == 200
+        # Warm the token and user caches
+        assert student.get("/api/auth/me").status_code == 200
+        queries.statements.clear()
+        response = student.get("/api/shifts/my")
+    assert response.status_code == 200
+    assert response.json() and all(s["user_name"] and s["location_name"] for s in response.json())
+    # The ETag aggregate, then one page of shifts joined to user and location names
+    assert queries.count == 2, queries.statements
@@ -0,0 +1,336 @@
+"""Scheduler benchmark suite with regression tracking.
+
+Runs the weekly scheduler at fixed sizes on workloads from generateData.py
+and records wall time, peak memory, SQL query count and schedule quality
+(unfilled minimum slots, fairness spread, average block length).
+
+    python benchmark_scheduler.py                         # DB-free core, all sizes
+    python benchmark_scheduler.py --mode sqlite --max-students 5000
+    python benchmark_scheduler.py --engine vectorized --solver optimal --sizes 50x3 500x5
+
+Each run is appended to a JSON history file. The run is compared with the
+last passing run of the same mode/engine/solver and exits with status 1
+when time or quality regressed beyond the thresholds.
+
+Modes:
+    core    call scheduler_core.solve_week directly (no database)
+    sqlite  seed a temporary SQLite database and call scheduler.generate_schedule
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from generateData import Workload, generate_workload
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+
+# (students, locations)
+DEFAULT_SIZES = [(50, 3), (500, 5), (5000, 20), (50000, 50)]
+
+# Time regressions below this many milliseconds are treated as noise
+TIME_NOISE_FLOOR_MS = 5.0
+
+
+def _next_monday() -> date:
+    today = date.today()
+    return today + timedelta(days=(7 - today.weekday()) % 7 or 7)
+
+
+def _quality(
+    assignments, workload: Workload, min_staff: dict[int, int], student_ids: list[int], open_days: list[str]
+) -> dict:
+    """Unfilled minimum slots, fairness spread over eligible students and average block length."""
+    staffed: dict[tuple[int, str], int] = {}
+    hours = dict.fromkeys(student_ids, 0)
+    total_block = 0
+    for a in assignments:
+        staffed[(a.location_id, a.day)] = staffed.get((a.location_id, a.day), 0) + 1
+        hours[a.user_id] += a.end_hour - a.start_hour
+        total_block += a.end_hour - a.start_hour
+
+    unfilled = sum(
+        max(need - staffed.get((loc_id, day), 0), 0) for loc_id, need in min_staff.items() for day in open_days
+    )
+    # Same eligibility rule as the scheduler: a positive cap and some free hour
+    eligible = (workload.max_hours > 0) & workload.availability.any(axis=(1, 2))
+    ratios = [
+        hours[sid] / max_h for sid, max_h, ok in zip(student_ids, workload.max_hours.tolist(), eligible.tolist()) if ok
+    ]
+    return {
+        "shifts": len(assignments),
+        "unfilled_min_slots": unfilled,
+        "fairness_spread": round(max(ratios) - min(ratios), 4) if ratios else 0.0,
+        "avg_block_hours": round(total_block / len(assignments), 3) if assignments else 0.0,
+    }
+
+
+def _measure(run, repeat: int) -> tuple[float, float, object]:
+    """Median wall time (ms) over ``repeat`` runs, then one traced run for peak memory (KiB)."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        times.append((time.perf_counter() - started) * 1000)
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(times), peak / 1024, result
+
+
+def bench_core(workload: Workload, args: argparse.Namespace) -> dict:
+    from app.services.scheduler_core import DAYS, HOUR_START, LocationInput, StudentInput, solve_week
+
+    # Availability bitmasks are indexed by absolute hour
+    bits = 1 << (np.arange(workload.availability.shape[2]) + HOUR_START)
+    day_masks = (workload.availability * bits).sum(axis=2).tolist()
+    student_ids = list(range(1, len(workload.names) + 1))
+    students = [
+        StudentInput(sid, float(max_h), {day: m for day, m in zip(DAYS, masks) if m})
+        for sid, max_h, masks in zip(student_ids, workload.max_hours.tolist(), day_masks)
+    ]
+    ordered = sorted(enumerate(workload.locations, start=1), key=lambda item: -item[1]["priority"])
+    locations = [LocationInput(loc_id, loc["name"], loc["min_staff"], loc["max_staff"]) for loc_id, loc in ordered]
+
+    def run():
+        return solve_week(
+            students,
+            locations,
+            DAYS,
+            engine=args.engine,
+            solver=args.solver,
+            time_limit_ms=args.time_limit_ms,
+            improve_budget_ms=args.improve_budget_ms,
+        )
+
+    wall_ms, peak_kib, result = _measure(run, args.repeat)
+    min_staff = {loc.id: loc.min_staff for loc in locations}
+    return {
+        "wall_ms": round(wall_ms, 2),
+        "peak_mem_kib": round(peak_kib, 1),
+        "queries": 0,
+        **_quality(result.assignments, workload, min_staff, student_ids, DAYS),
+    }
+
+
+def bench_sqlite(workload: Workload, args: argparse.Namespace) -> dict:
+    from sqlalchemy import event, insert, select
+
+    from app.auth.jwt import hash_password
+    from app.database import Base, SessionLocal, engine
+    from app.models.location import Location
+    from app.models.user import User, UserRole
+    from app.services.scheduler import generate_schedule
+    from app.services.scheduler_core import Assignment, DAYS
+    from generateData import seed_database
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    seed_database(workload)
+    with SessionLocal() as db:
+        supervisor_id = db.execute(
+            insert(User)
+            .values(
+                email="benchmark@helpdesk.edu",
+                password_hash=hash_password("benchmark"),
+                first_name="Bench",
+                last_name="Mark",
+                role=UserRole.supervisor,
+            )
+            .returning(User.id)
+        ).scalar_one()
+        db.commit()
+        student_ids = list(db.scalars(select(User.id).where(User.role == UserRole.student).order_by(User.id)))
+        min_staff = dict(db.execute(select(Location.id, Location.min_staff)).all())
+
+    queries = 0
+
+    def count_query(*_args) -> None:
+        nonlocal queries
+        queries += 1
+
+    week_start = _next_monday()
+
+    def run():
+        nonlocal queries
+        queries = 0
+        with SessionLocal() as db:
+            return generate_schedule(
+                db,
+                week_start,
+                supervisor_id,
+                engine=args.engine,
+                solver=args.solver,
+                time_limit_ms=args.time_limit_ms,
+                improve_budget_ms=args.improve_budget_ms,
+                bypass_cache=True,
+            )
+
+    event.listen(engine, "before_cursor_execute", count_query)
+    try:
+        wall_ms, peak_kib, (schedule, _, _) = _measure(run, args.repeat)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_query)
+
+    assignments = [
+        Assignment(s.user_id, s.location_id, s.day_of_week, s.start_time.hour, s.end_time.hour) for s in schedule.shifts
+    ]
+    return {
+        "wall_ms": round(wall_ms, 2),
+        "peak_mem_kib": round(peak_kib, 1),
+        "queries": queries,
+        **_quality(assignments, workload, min_staff, student_ids, DAYS),
+    }
+
+
+def find_regressions(current: list[dict], previous: list[dict], args: argparse.Namespace) -> list[str]:
+    """Compare results size by size; returns human-readable regression messages."""
+    before = {(r["students"], r["locations"]): r for r in previous}
+    problems = []
+    for r in current:
+        old = before.get((r["students"], r["locations"]))
+        if old is None:
+            continue
+        size = f"{r['students']}x{r['locations']}"
+        if (
+            r["wall_ms"] > old["wall_ms"] * (1 + args.time_threshold)
+            and r["wall_ms"] - old["wall_ms"] > TIME_NOISE_FLOOR_MS
+        ):
+            problems.append(f"{size}: wall time {old['wall_ms']} -> {r['wall_ms']} ms")
+        if r["peak_mem_kib"] > old["peak_mem_kib"] * (1 + args.memory_threshold):
+            problems.append(f"{size}: peak memory {old['peak_mem_kib']} -> {r['peak_mem_kib']} KiB")
+        if r["queries"] > old["queries"]:
+            problems.append(f"{size}: queries {old['queries']} -> {r['queries']}")
+        if r["unfilled_min_slots"] > old["unfilled_min_slots"]:
+            problems.append(f"{size}: unfilled min slots {old['unfilled_min_slots']} -> {r['unfilled_min_slots']}")
+        if r["fairness_spread"] > old["fairness_spread"] + args.quality_threshold:
+            problems.append(f"{size}: fairness spread {old['fairness_spread']} -> {r['fairness_spread']}")
+        if r["avg_block_hours"] < old["avg_block_hours"] - args.quality_threshold:
+            problems.append(f"{size}: avg block {old['avg_block_hours']} -> {r['avg_block_hours']} h")
+    return problems
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _size(value: str) -> tuple[int, int]:
+    students, _, locations = value.partition("x")
+    return int(students), int(locations)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["core", "sqlite"], default="core")
+    parser.add_argument("--engine", choices=["heap", "vectorized"], default="heap")
+    parser.add_argument("--solver", choices=["greedy", "optimal"], default="greedy")
+    parser.add_argument("--time-limit-ms", type=int, default=5000)
+    parser.add_argument("--improve-budget-ms", type=int, default=0)
+    parser.add_argument(
+        "--sizes",
+        type=_size,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="STUDENTSxLOCATIONS pairs (default: 50x3 500x5 5000x20 50000x50)",
+    )
+    parser.add_argument("--max-students", type=int, default=None, help="skip sizes above this many students")
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per size (median is kept)")
+    parser.add_argument("--history", default="benchmark_history.json")
+    parser.add_argument("--time-threshold", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--memory-threshold", type=float, default=0.25, help="allowed relative memory growth")
+    parser.add_argument(
+        "--quality-threshold",
+        type=float,
+        default=0.05,
+        help="allowed fairness spread increase / average block decrease",
+    )
+    parser.add_argument("--no-record", action="store_true", help="compare only; do not append to the history")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, BACKEND_DIR)
+    if args.mode == "sqlite":
+        # Must be set before app.config is imported
+        db_path = os.path.join(tempfile.mkdtemp(prefix="scheduler-bench-"), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+        import app.main  # noqa: F401  (registers all models)
+    bench = bench_sqlite if args.mode == "sqlite" else bench_core
+
+    sizes = [s for s in args.sizes if args.max_students is None or s[0] <= args.max_students]
+    results = []
+    print(f"{'size':>10} {'wall ms':>10} {'peak KiB':>10} {'queries':>8} {'unfilled':>9} {'spread':>7} {'block h':>8}")
+    for students, locations in sizes:
+        workload = generate_workload(num_students=students, num_locations=locations, seed=args.seed)
+        r = {"students": students, "locations": locations, **bench(workload, args)}
+        results.append(r)
+        print(
+            f"{students:>6}x{locations:<3} {r['wall_ms']:>10} {r['peak_mem_kib']:>10} {r['queries']:>8} "
+            f"{r['unfilled_min_slots']:>9} {r['fairness_spread']:>7} {r['avg_block_hours']:>8}"
+        )
+
+    history = []
+    if os.path.exists(args.history):
+        with open(args.history) as f:
+            history = json.load(f)
+    config = {
+        "mode": args.mode,
+        "engine": args.engine,
+        "solver": args.solver,
+        "time_limit_ms": args.time_limit_ms,
+        "improve_budget_ms": args.improve_budget_ms,
+        "seed": args.seed,
+    }
+    previous = next((run for run in reversed(history) if run["config"] == config and run["passed"]), None)
+    problems = find_regressions(results, previous["results"], args) if previous else []
+
+    if not args.no_record:
+        history.append(
+            {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "commit": _git_commit(),
+                "config": config,
+                "passed": not problems,
+                "results": results,
+            }
+        )
+        with open(args.history, "w") as f:
+            json.dump(history, f, indent=2)
+
+    if previous is None:
+        if args.no_record:
+            print("No previous run with this configuration; nothing recorded (--no-record).")
+        else:
+            print("No previous run with this configuration; recorded as the baseline.")
+    if problems:
+        print(f"❌ Regressions against run from {previous['timestamp']} ({previous['commit']}):")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
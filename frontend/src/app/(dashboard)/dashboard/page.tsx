@@ -7,7 +7,7 @@ import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/com
 import { Badge } from "@/components/ui/badge";
 import { RoleGate } from "@/components/role-gate";
 import { Calendar, Clock, Users, AlertTriangle } from "lucide-react";
-import type { Schedule, Shift, TimeOffRequest, Notification as NotificationType } from "@/lib/types";
+import type { ScheduleSummary, Shift, TimeOffRequest, Notification as NotificationType } from "@/lib/types";
 
 export default function DashboardPage() {
   const { user } = useAuth();
@@ -107,11 +107,11 @@ function StudentDashboard() {
 
 function SupervisorDashboard() {
   const [pendingTimeOff, setPendingTimeOff] = useState<TimeOffRequest[]>([]);
-  const [schedules, setSchedules] = useState<Schedule[]>([]);
+  const [schedules, setSchedules] = useState<ScheduleSummary[]>([]);
 
   useEffect(() => {
     api.timeOff.getPending().then((d) => setPendingTimeOff(d as TimeOffRequest[])).catch(() => {});
-    api.schedules.list().then((d) => setSchedules(d as Schedule[])).catch(() => {});
+    api.schedules.list().then((d) => setSchedules(d as ScheduleSummary[])).catch(() => {});
   }, []);
 
   const published = schedules.filter((s) => s.status === "published");
@@ -18,14 +18,14 @@ import {
   TableRow,
 } from "@/components/ui/table";
 import { toast } from "sonner";
-import type { Schedule, GenerateScheduleResponse, ScheduleWarning } from "@/lib/types";
+import type { Schedule, ScheduleSummary, GenerateScheduleResponse, ScheduleWarning } from "@/lib/types";
 
 const DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"];
 
 export default function SchedulePage() {
   const { user } = useAuth();
   const [schedule, setSchedule] = useState<Schedule | null>(null);
-  const [schedules, setSchedules] = useState<Schedule[]>([]);
+  const [schedules, setSchedules] = useState<ScheduleSummary[]>([]);
   const [weekStart, setWeekStart] = useState("");
   const [warnings, setWarnings] = useState<ScheduleWarning[]>([]);
   const [generating, setGenerating] = useState(false);
@@ -38,9 +38,9 @@ export default function SchedulePage() {
   const loadData = async () => {
     try {
       if (user?.role === "supervisor") {
-        const data = (await api.schedules.list()) as Schedule[];
+        const data = (await api.schedules.list()) as ScheduleSummary[];
         setSchedules(data);
-        if (data.length > 0) setSchedule(data[0]);
+        if (data.length > 0) setSchedule((await api.schedules.get(data[0].id)) as Schedule);
       } else {
         const data = (await api.schedules.getCurrent()) as Schedule | null;
         setSchedule(data);
@@ -52,6 +52,14 @@ export default function SchedulePage() {
     }
   };
 
+  const handleSelect = async (id: number) => {
+    try {
+      setSchedule((await api.schedules.get(id)) as Schedule);
+    } catch (err) {
+      toast.error(err instanceof Error ? err.message : "Failed to load schedule");
+    }
+  };
+
   const handleGenerate = async () => {
     if (!weekStart) {
       toast.error("Please select a week start date");
@@ -156,14 +164,14 @@ export default function SchedulePage() {
                 </TableHeader>
                 <TableBody>
                   {schedules.map((s) => (
-                    <TableRow key={s.id} className="cursor-pointer" onClick={() => setSchedule(s)}>
+                    <TableRow key={s.id} className="cursor-pointer" onClick={() => handleSelect(s.id)}>
                       <TableCell>{s.week_start_date}</TableCell>
                       <TableCell>
                         <Badge variant={s.status === "published" ? "default" : s.status === "draft" ? "secondary" : "outline"}>
                           {s.status}
                         </Badge>
                       </TableCell>
-                      <TableCell>{s.shifts.length}</TableCell>
+                      <TableCell>{s.shift_count}</TableCell>
                       <TableCell className="flex gap-2" onClick={(e) => e.stopPropagation()}>
                         {s.status === "draft" && (
                           <>
@@ -2,7 +2,7 @@ const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
 type FetchOptions = RequestInit & { params?: Record<string, string> };
 
-async function apiFetch<T>(path: string, options: FetchOptions = {}): Promise<T> {
+async function send(path: string, options: FetchOptions = {}): Promise<Response> {
   const { params, ...init } = options;
   let url = `${API_URL}${path}`;
   if (params) {
@@ -18,10 +18,28 @@ async function apiFetch<T>(path: string, options: FetchOptions = {}): Promise<T>
     const body = await res.json().catch(() => ({}));
     throw new Error(body.detail || `API error ${res.status}`);
   }
+  return res;
+}
+
+async function apiFetch<T>(path: string, options: FetchOptions = {}): Promise<T> {
+  const res = await send(path, options);
   if (res.status === 204) return {} as T;
   return res.json();
 }
 
+// List endpoints return one page at a time; follow X-Next-Cursor to the end
+async function apiFetchAll<T>(path: string, options: FetchOptions = {}): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const params: Record<string, string> = { ...options.params, ...(cursor ? { cursor } : {}) };
+    const res = await send(path, { ...options, params });
+    items.push(...((await res.json()) as T[]));
+    cursor = res.headers.get("X-Next-Cursor");
+  } while (cursor);
+  return items;
+}
+
 // Auth
 export const api = {
   auth: {
@@ -35,7 +53,7 @@ export const api = {
   },
 
   users: {
-    list: () => apiFetch("/api/users/"),
+    list: () => apiFetchAll("/api/users/"),
     get: (id: number) => apiFetch(`/api/users/${id}`),
     update: (id: number, data: Record<string, unknown>) =>
       apiFetch(`/api/users/${id}`, { method: "PATCH", body: JSON.stringify(data) }),
@@ -75,7 +93,7 @@ export const api = {
       apiFetch("/api/schedules/generate", { method: "POST", body: JSON.stringify(data) }),
     getCurrent: () => apiFetch("/api/schedules/current"),
     list: (status?: string) =>
-      apiFetch("/api/schedules/", { params: status ? { status } : undefined }),
+      apiFetchAll("/api/schedules/", { params: status ? { status } : undefined }),
     get: (id: number) => apiFetch(`/api/schedules/${id}`),
     publish: (id: number) => apiFetch(`/api/schedules/${id}/publish`, { method: "PATCH" }),
     archive: (id: number) => apiFetch(`/api/schedules/${id}/archive`, { method: "PATCH" }),
@@ -83,7 +101,7 @@ export const api = {
   },
 
   shifts: {
-    getMine: () => apiFetch("/api/shifts/my"),
+    getMine: () => apiFetchAll("/api/shifts/my"),
     create: (data: Record<string, unknown>) =>
       apiFetch("/api/shifts/", { method: "POST", body: JSON.stringify(data) }),
     update: (id: number, data: Record<string, unknown>) =>
@@ -92,7 +110,7 @@ export const api = {
   },
 
   holidays: {
-    list: () => apiFetch("/api/holidays/"),
+    list: () => apiFetchAll("/api/holidays/"),
     create: (data: Record<string, unknown>) =>
       apiFetch("/api/holidays/", { method: "POST", body: JSON.stringify(data) }),
     update: (id: number, data: Record<string, unknown>) =>
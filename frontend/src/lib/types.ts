@@ -63,6 +63,18 @@ export interface Schedule {
   shifts: Shift[];
 }
 
+export interface ScheduleSummary {
+  id: number;
+  week_start_date: string;
+  status: ScheduleStatus;
+  generated_by: number | null;
+  notes: string | null;
+  created_at: string;
+  shift_count: number;
+  student_count: number;
+  total_hours: number;
+}
+
 export interface ScheduleWarning {
   day: string;
   time_slot: string;
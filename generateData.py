@@ -1,46 +1,278 @@
-import pandas as pd
-import random
+"""Synthetic workload generator for the scheduler.
+
+Produces students with realistic class-block availability and max-hour caps,
+plus any number of locations, and either writes the standardized
+availability CSV (Name, Max_Hours, Monday_8:00, ...) or seeds the backend
+database directly with bulk inserts.
+
+    python generateData.py                               # 15 students -> student_availability.csv
+    python generateData.py --students 5000 --seed 42 --output big.csv
+    python generateData.py --students 50000 --locations 20 --seed-db
+
+Everything is generated with NumPy in a handful of array operations, so
+100,000 students take about a second.
+"""
+
+import argparse
+import csv
+import os
+import sys
+from dataclasses import dataclass
+
+import numpy as np
 
 # --- CONFIGURATION ---
-NUM_STUDENTS = 15
 # We assume the Help Desk is open 8am - 6pm (10 hours)
-SHIFTS = [f"{h}:00" for h in range(8, 18)]
+HOUR_START = 8
+HOUR_END = 18
+SHIFTS = [f"{h}:00" for h in range(HOUR_START, HOUR_END)]
 DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
 
-names = [
-    "Alex", "Jordan", "Taylor", "Morgan", "Casey", 
+FIRST_NAMES = [
+    "Alex", "Jordan", "Taylor", "Morgan", "Casey",
     "Riley", "Jamie", "Dakota", "Cameron", "Avery",
     "Quinn", "Hayden", "Sam", "Charlie", "Peyton"
 ]
 
-# --- GENERATE DATA ---
-data = []
-
-for i in range(NUM_STUDENTS):
-    student_row = {'Name': names[i]}
-    
-    # Randomly assign a "Max Hours" cap (mostly 20, some less)
-    student_row['Max_Hours'] = random.choice([10, 15, 20, 20, 20])
-    
-    # For each day, simulate class schedules
-    # 1 = Available to work, 0 = In Class
-    for day in DAYS:
-        # Create a pattern: Students usually have blocks of classes
-        # Let's say they are available for 60% of the day roughly
-        daily_availability = []
-        for time in SHIFTS:
-            # 70% chance they are free at any given hour
-            is_free = 1 if random.random() > 0.3 else 0
-            student_row[f"{day}_{time}"] = is_free
-            
-    data.append(student_row)
-
-# --- SAVE TO EXCEL ---
-df = pd.DataFrame(data)
-
-# We save as CSV because it's easier to inspect, but you could use .xlsx too
-filename = "student_availability.csv"
-df.to_csv(filename, index=False)
-
-print(f"✅ Successfully created {filename}")
-print("Open this file in Excel to see what your 'Standardized Input' looks like.")
\ No newline at end of file
+# The real locations (same as backend/seed.py), used first when generating locations
+DEFAULT_LOCATIONS = [
+    {"name": "Bristlecone", "min_staff": 1, "max_staff": 1, "priority": 3},
+    {"name": "Library", "min_staff": 1, "max_staff": 2, "priority": 2},
+    {"name": "Main Desk", "min_staff": 2, "max_staff": 10, "priority": 1},
+]
+
+# Class meeting patterns: (weekday indexes, class length in hours)
+MWF = ([0, 2, 4], 1)
+TR = ([1, 3], 2)
+
+
+@dataclass
+class Workload:
+    names: list[str]
+    max_hours: np.ndarray      # (students,) int
+    availability: np.ndarray   # (students, days, hours) bool, True = free to work
+    locations: list[dict]
+
+
+def generate_workload(
+    num_students: int = 15,
+    num_locations: int = 3,
+    seed: int | None = None,
+    courses: tuple[int, int] = (3, 6),
+    mwf_share: float = 0.6,
+    off_day_rate: float = 0.1,
+    busy_noise: float = 0.05,
+    max_hours_choices: tuple[int, ...] = (10, 15, 20),
+    max_hours_weights: tuple[float, ...] = (0.2, 0.2, 0.6),
+    min_staff: tuple[int, int] = (1, 2),
+    max_staff: tuple[int, int] = (1, 10),
+) -> Workload:
+    """Generate a reproducible workload.
+
+    Each student takes a number of courses in ``courses`` (inclusive range).
+    A course meets either Monday/Wednesday/Friday for one hour
+    (probability ``mwf_share``) or Tuesday/Thursday for two hours, at a
+    random start time. On top of classes, each student is off campus for a
+    whole day with probability ``off_day_rate`` and busy for any other hour
+    with probability ``busy_noise``.
+    """
+    rng = np.random.default_rng(seed)
+    n = num_students
+    n_days, n_hours = len(DAYS), len(SHIFTS)
+    max_courses = courses[1]
+
+    # Courses: which exist, their pattern, and their start hour
+    course_count = rng.integers(courses[0], courses[1] + 1, size=n)
+    has_course = np.arange(max_courses)[None, :] < course_count[:, None]         # (n, K)
+    is_mwf = rng.random((n, max_courses)) < mwf_share                             # (n, K)
+    length = np.where(is_mwf, MWF[1], TR[1])                                      # (n, K)
+    start = rng.integers(0, n_hours - length + 1)                                 # (n, K)
+
+    mwf_days = np.isin(np.arange(n_days), MWF[0])
+    tr_days = np.isin(np.arange(n_days), TR[0])
+    meets_on = np.where(is_mwf[..., None], mwf_days, tr_days) & has_course[..., None]  # (n, K, D)
+    hours = np.arange(n_hours)
+    in_class = (hours >= start[..., None]) & (hours < (start + length)[..., None])     # (n, K, H)
+    busy = (meets_on[..., :, None] & in_class[..., None, :]).any(axis=1)               # (n, D, H)
+
+    busy |= (rng.random((n, n_days)) < off_day_rate)[..., None]
+    busy |= rng.random((n, n_days, n_hours)) < busy_noise
+
+    weights = np.asarray(max_hours_weights, dtype=float)
+    max_hours = rng.choice(np.asarray(max_hours_choices), size=n, p=weights / weights.sum())
+
+    return Workload(student_names(n), max_hours, ~busy, _generate_locations(rng, num_locations, min_staff, max_staff))
+
+
+def student_names(count: int) -> list[str]:
+    """Bare first names up to len(FIRST_NAMES) students, as in the original CSV
+    (which upload-csv matches to users by first name); numbered names beyond that."""
+    if count <= len(FIRST_NAMES):
+        return FIRST_NAMES[:count]
+    return [f"{FIRST_NAMES[i % len(FIRST_NAMES)]} Student{i + 1:06d}" for i in range(count)]
+
+
+def _generate_locations(
+    rng: np.random.Generator,
+    count: int,
+    min_staff: tuple[int, int],
+    max_staff: tuple[int, int],
+) -> list[dict]:
+    locations = [dict(loc) for loc in DEFAULT_LOCATIONS[:count]]
+    extra = count - len(locations)
+    if extra > 0:
+        mins = rng.integers(min_staff[0], min_staff[1] + 1, size=extra)
+        maxes = np.maximum(rng.integers(max_staff[0], max_staff[1] + 1, size=extra), mins)
+        priorities = rng.integers(0, 4, size=extra)
+        for i in range(extra):
+            locations.append({
+                "name": f"Location {len(DEFAULT_LOCATIONS) + i + 1}",
+                "min_staff": int(mins[i]),
+                "max_staff": int(maxes[i]),
+                "priority": int(priorities[i]),
+            })
+    return locations
+
+
+def write_csv(workload: Workload, filename: str) -> None:
+    """Write the standardized availability CSV (1 = available, 0 = in class)."""
+    header = ["Name", "Max_Hours"] + [f"{day}_{time}" for day in DAYS for time in SHIFTS]
+    flat = workload.availability.reshape(len(workload.names), -1).astype(np.int8)
+    with open(filename, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for name, max_h, row in zip(workload.names, workload.max_hours.tolist(), flat.tolist()):
+            writer.writerow([name, max_h, *row])
+
+
+def availability_runs(workload: Workload) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Contiguous free runs as parallel arrays (student, day, start_hour, end_hour)."""
+    free = workload.availability.astype(np.int8)
+    padded = np.zeros(free.shape[:2] + (free.shape[2] + 2,), dtype=np.int8)
+    padded[..., 1:-1] = free
+    edges = np.diff(padded, axis=2)
+    s_student, s_day, s_hour = np.nonzero(edges == 1)
+    _, _, e_hour = np.nonzero(edges == -1)
+    # nonzero walks in C order, so starts and ends pair up run by run
+    return s_student, s_day, s_hour + HOUR_START, e_hour + HOUR_START
+
+
+def seed_database(workload: Workload, password: str = "student123", chunk_size: int = 5000) -> None:
+    """Insert the workload's locations, students and availability into the backend DB."""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+    from datetime import time
+
+    from sqlalchemy import insert, select
+
+    import app.main  # noqa: F401  (registers all models)
+    from app.auth.jwt import hash_password
+    from app.database import Base, SessionLocal, engine
+    from app.models.availability import Availability
+    from app.models.location import Location
+    from app.models.user import User, UserRole
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        existing = set(db.scalars(select(Location.name)))
+        new_locations = [loc for loc in workload.locations if loc["name"] not in existing]
+        if new_locations:
+            db.execute(insert(Location), new_locations)
+
+        # One hash for every generated account; bcrypt per user would dominate
+        password_hash = hash_password(password)
+        user_ids: list[int] = []
+        for lo in range(0, len(workload.names), chunk_size):
+            rows = [
+                {
+                    "email": f"student{lo + i + 1:06d}@generated.helpdesk.edu",
+                    "password_hash": password_hash,
+                    "first_name": name.partition(" ")[0],
+                    "last_name": name.partition(" ")[2] or f"Student{lo + i + 1:06d}",
+                    "role": UserRole.student,
+                    "max_hours_per_week": float(max_h),
+                    "is_active": True,
+                }
+                for i, (name, max_h) in enumerate(
+                    zip(workload.names[lo:lo + chunk_size], workload.max_hours[lo:lo + chunk_size].tolist())
+                )
+            ]
+            returned = db.execute(insert(User).returning(User.id, User.email), rows)
+            by_email = {r.email: r.id for r in returned}
+            user_ids.extend(by_email[row["email"]] for row in rows)
+
+        students, days, starts, ends = availability_runs(workload)
+        avail_rows = [
+            {
+                "user_id": user_ids[s],
+                "day_of_week": DAYS[d],
+                "start_time": time(h0, 0),
+                "end_time": time(h1, 0),
+                "is_recurring": True,
+            }
+            for s, d, h0, h1 in zip(students.tolist(), days.tolist(), starts.tolist(), ends.tolist())
+        ]
+        for lo in range(0, len(avail_rows), chunk_size):
+            db.execute(insert(Availability), avail_rows[lo:lo + chunk_size])
+        db.commit()
+    finally:
+        db.close()
+    print(
+        f"✅ Seeded {len(new_locations)} locations, {len(user_ids)} students "
+        f"and {len(avail_rows)} availability rows"
+    )
+
+
+def _int_range(value: str) -> tuple[int, int]:
+    low, _, high = value.partition("-")
+    return int(low), int(high or low)
+
+
+def _weighted_choices(value: str) -> tuple[tuple[int, ...], tuple[float, ...]]:
+    pairs = [item.split(":") for item in value.split(",")]
+    return tuple(int(h) for h, _ in pairs), tuple(float(w) for _, w in pairs)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=15, help="number of students (default 15)")
+    parser.add_argument("--locations", type=int, default=3, help="number of locations (default 3)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible output")
+    parser.add_argument("--courses", type=_int_range, default=(3, 6), help="courses per student, e.g. 3-6")
+    parser.add_argument("--mwf-share", type=float, default=0.6, help="share of courses meeting MWF")
+    parser.add_argument("--off-day-rate", type=float, default=0.1, help="chance of a whole day off campus")
+    parser.add_argument("--busy-noise", type=float, default=0.05, help="chance of any other busy hour")
+    parser.add_argument("--max-hours", type=_weighted_choices, default=((10, 15, 20), (0.2, 0.2, 0.6)),
+                        help="max-hours distribution as hours:weight pairs, e.g. 10:0.2,15:0.2,20:0.6")
+    parser.add_argument("--min-staff", type=_int_range, default=(1, 2), help="min staff range for extra locations")
+    parser.add_argument("--max-staff", type=_int_range, default=(1, 10), help="max staff range for extra locations")
+    parser.add_argument("--output", default="student_availability.csv", help="CSV file to write")
+    parser.add_argument("--seed-db", action="store_true", help="insert into the backend database instead of writing CSV")
+    args = parser.parse_args(argv)
+
+    workload = generate_workload(
+        num_students=args.students,
+        num_locations=args.locations,
+        seed=args.seed,
+        courses=args.courses,
+        mwf_share=args.mwf_share,
+        off_day_rate=args.off_day_rate,
+        busy_noise=args.busy_noise,
+        max_hours_choices=args.max_hours[0],
+        max_hours_weights=args.max_hours[1],
+        min_staff=args.min_staff,
+        max_staff=args.max_staff,
+    )
+
+    if args.seed_db:
+        seed_database(workload)
+        return
+
+    # --- SAVE TO CSV ---
+    write_csv(workload, args.output)
+    print(f"✅ Successfully created {args.output} ({len(workload.names)} students)")
+    print("Open this file in Excel to see what your 'Standardized Input' looks like.")
+
+
+if __name__ == "__main__":
+    main()